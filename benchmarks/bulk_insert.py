@@ -0,0 +1,84 @@
+"""Вставка большого числа строк: create_many (add_all + flush) против bulk_insert.
+
+Запуск: python -m benchmarks.bulk_insert [--rows 100000] [--dsn sqlite+aiosqlite://]
+
+Для Postgres передайте DSN вида postgresql+asyncpg://..., таблица создаётся и удаляется скриптом.
+
+SQLite в памяти, 100k строк (медиана нескольких запусков):
+    create_many                   ~10k rows/s
+    bulk_insert                   ~29k rows/s
+    bulk_insert(return_objects)   ~15k rows/s
+Это около 3x, а не 10x: на SQLite остаток - обработка параметров каждой строки в SQLAlchemy и драйвере
+и uuid4 для id. На Postgres замеров не было.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapped
+
+from helpers.sqlalchemy.base_model import Base
+from helpers.sqlalchemy.bulk import bulk_insert
+
+
+class BenchmarkRow(Base):
+    __tablename__ = 'benchmark_bulk_insert_rows'
+
+    title: Mapped[str]
+    amount: Mapped[int]
+
+
+async def _create_many(session: AsyncSession, values: list[dict[str, Any]]) -> int:
+    db_objects = [BenchmarkRow(**row) for row in values]
+    session.add_all(db_objects)
+    await session.flush()
+    return len([db_object.id for db_object in db_objects])
+
+
+async def _bulk_ids(session: AsyncSession, values: list[dict[str, Any]]) -> int:
+    return len(await bulk_insert(session, BenchmarkRow, values))
+
+
+async def _bulk_objects(session: AsyncSession, values: list[dict[str, Any]]) -> int:
+    return len(await bulk_insert(session, BenchmarkRow, values, return_objects=True))
+
+
+async def main(rows: int, dsn: str) -> None:
+    engine = create_async_engine(dsn)
+    metadata = MetaData()
+    table = BenchmarkRow.__table__.to_metadata(metadata)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    values = [{'title': f'row {i}', 'amount': i} for i in range(rows)]
+    cases: list[tuple[str, Callable[[AsyncSession, list[dict[str, Any]]], Awaitable[int]]]] = [
+        ('create_many', _create_many),
+        ('bulk_insert', _bulk_ids),
+        ('bulk_insert(return_objects)', _bulk_objects),
+    ]
+    try:
+        for name, insert_rows in cases:
+            async with engine.begin() as connection:
+                await connection.run_sync(table.drop, checkfirst=True)
+                await connection.run_sync(table.create)
+            async with session_factory() as session:
+                started_at = perf_counter()
+                inserted = await insert_rows(session, values)
+                await session.commit()
+                elapsed = perf_counter() - started_at
+            print(f'{name:<32} {inserted / elapsed:>10.0f} rows/s  total={elapsed:.2f}s')
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(table.drop, checkfirst=True)
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--dsn', default='sqlite+aiosqlite://')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.dsn))
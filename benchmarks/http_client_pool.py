@@ -0,0 +1,60 @@
+"""Сравнение BaseApiClient с собственным транспортом и с общим пулом соединений.
+
+Запуск: python -m benchmarks.http_client_pool [--requests 5000] [--concurrency 50]
+
+Клиент создаётся на каждый запрос, как это делают сервисы в зависимостях FastAPI.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from loguru import logger
+
+from benchmarks.utils import run_stand_in_server, summarize
+from helpers.clients.http_client import BaseApiClient
+from helpers.clients.pool import close_shared_transports
+
+
+class PerRequestUpstreamClient(BaseApiClient):
+    _base_url = 'http://127.0.0.1'
+
+
+class PooledUpstreamClient(BaseApiClient):
+    _base_url = 'http://127.0.0.1'
+    _shared_transport = True
+
+
+async def _run(client_cls: type[BaseApiClient], base_url: str, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def _one() -> None:
+        async with semaphore:
+            started_at = perf_counter()
+            async with client_cls() as client:
+                client.base_url = base_url
+                response = await client.get('/ping')
+                response.raise_for_status()
+            latencies.append(perf_counter() - started_at)
+
+    await asyncio.gather(*(_one() for _ in range(requests)))
+    return latencies
+
+
+async def main(requests: int, concurrency: int) -> None:
+    logger.remove()
+    async with run_stand_in_server() as base_url:
+        for client_cls in (PerRequestUpstreamClient, PooledUpstreamClient):
+            started_at = perf_counter()
+            latencies = await _run(client_cls, base_url, requests, concurrency)
+            print(summarize(client_cls.__name__, latencies, perf_counter() - started_at))
+        await close_shared_transports()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
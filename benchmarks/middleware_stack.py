@@ -0,0 +1,108 @@
+"""Сравнение стека BaseHTTPMiddleware (TraceId, Auth, ErrorsHandler) с RequestContextMiddleware.
+
+Запуск: python -m benchmarks.middleware_stack [--requests 5000] [--concurrency 50]
+
+Приложение вызывается в том же процессе через httpx.ASGITransport, поэтому разница во времени -
+это накладные расходы самих middleware.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime, timedelta
+from time import perf_counter
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import SecretStr
+
+from benchmarks.utils import summarize
+from helpers.api.middleware.auth import AuthASGIMiddleware, AuthMiddleware
+from helpers.api.middleware.auth.constants import DEFAULT_TOKEN_HEADER_NAME
+from helpers.api.middleware.request_context import RequestContextMiddleware
+from helpers.api.middleware.trace_id.middleware import (
+    TraceIdASGIMiddleware,
+    TraceIdMiddleware,
+)
+from helpers.api.middleware.unexpected_errors.middleware import (
+    ErrorsHandlerASGIMiddleware,
+    ErrorsHandlerMiddleware,
+)
+from helpers.jwt import encode_jwt
+
+KEY = SecretStr('benchmark-secret')
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/ping')
+    async def ping() -> dict[str, str]:
+        return {'status': 'ok'}
+
+    return app
+
+
+def make_base_http_stack() -> FastAPI:
+    app = _make_app()
+    app.add_middleware(ErrorsHandlerMiddleware)
+    app.add_middleware(AuthMiddleware, key=KEY)
+    app.add_middleware(TraceIdMiddleware)
+    return app
+
+
+def make_asgi_stack() -> FastAPI:
+    app = _make_app()
+    app.add_middleware(ErrorsHandlerASGIMiddleware)
+    app.add_middleware(AuthASGIMiddleware, key=KEY)
+    app.add_middleware(TraceIdASGIMiddleware)
+    return app
+
+
+def make_fused() -> FastAPI:
+    app = _make_app()
+    app.add_middleware(RequestContextMiddleware, key=KEY)
+    return app
+
+
+async def _run(app: FastAPI, requests: int, concurrency: int, token: str) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+
+        async def _one() -> None:
+            async with semaphore:
+                started_at = perf_counter()
+                response = await client.get('/ping', headers={DEFAULT_TOKEN_HEADER_NAME: token})
+                response.raise_for_status()
+                latencies.append(perf_counter() - started_at)
+
+        await asyncio.gather(*(_one() for _ in range(requests)))
+    return latencies
+
+
+async def main(requests: int, concurrency: int) -> None:
+    token = encode_jwt(
+        KEY.get_secret_value(),
+        {'user_id': '1', 'status': None, 'type': 'ACCESS', 'exp': datetime.now(tz=UTC) + timedelta(hours=1)},
+        'HS256',
+    )
+    for name, make_app in (
+        ('no middleware', _make_app),
+        ('BaseHTTPMiddleware stack', make_base_http_stack),
+        ('pure ASGI stack', make_asgi_stack),
+        ('RequestContextMiddleware', make_fused),
+    ):
+        app = make_app()
+        await _run(app, min(requests, 200), concurrency, token)
+        started_at = perf_counter()
+        latencies = await _run(app, requests, concurrency, token)
+        print(summarize(name, latencies, perf_counter() - started_at))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
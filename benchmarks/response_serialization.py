@@ -0,0 +1,87 @@
+"""Сериализация PaginatedResponse на 10k элементов: UJSONResponse против PydanticJSONResponse.
+
+Запуск: python -m benchmarks.response_serialization [--requests 50] [--items 10000]
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from time import perf_counter
+from uuid import UUID, uuid4
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+
+from benchmarks.utils import summarize
+from helpers.api.router import FastAPILoggingRouter
+from helpers.models.base import CamelAliasBaseModel
+from helpers.models.response import PaginatedResponse
+
+
+class Item(CamelAliasBaseModel):
+    item_id: UUID
+    title: str
+    price: float
+    is_active: bool
+    created_at: datetime
+
+
+def _make_app(items: int, **router_kwargs: object) -> FastAPI:
+    payload = PaginatedResponse(
+        page=1,
+        size=items,
+        total=items,
+        total_pages=1,
+        data=[
+            Item(
+                item_id=uuid4(),
+                title=f'item {i}',
+                price=i * 1.5,
+                is_active=i % 2 == 0,
+                created_at=datetime.now(tz=UTC),
+            )
+            for i in range(items)
+        ],
+    )
+    router = FastAPILoggingRouter(**router_kwargs)  # type: ignore
+
+    @router.get('/items')
+    async def get_items() -> PaginatedResponse:
+        return payload
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def _run(app: FastAPI, requests: int) -> list[float]:
+    latencies: list[float] = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+        for _ in range(requests):
+            started_at = perf_counter()
+            response = await client.get('/items')
+            response.raise_for_status()
+            latencies.append(perf_counter() - started_at)
+    return latencies
+
+
+async def main(requests: int, items: int) -> None:
+    logger.remove()
+    for name, router_kwargs in (
+        ('UJSONResponse', {}),
+        ('PydanticJSONResponse', {'direct_model_response': True}),
+    ):
+        app = _make_app(items, **router_kwargs)
+        await _run(app, 2)
+        started_at = perf_counter()
+        latencies = await _run(app, requests)
+        print(summarize(name, latencies, perf_counter() - started_at))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--items', type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.items))
@@ -0,0 +1,53 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+RESPONSE_BODY = b'{"status":"ok"}'
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            content_length = 0
+            for line in head.split(b'\r\n'):
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    content_length = int(value.strip())
+            if content_length:
+                await reader.readexactly(content_length)
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: application/json\r\n'
+                b'Content-Length: ' + str(len(RESPONSE_BODY)).encode() + b'\r\n'
+                b'Connection: keep-alive\r\n\r\n' + RESPONSE_BODY,
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+@asynccontextmanager
+async def run_stand_in_server() -> AsyncGenerator[str, None]:
+    server = await asyncio.start_server(_handle_connection, host='127.0.0.1', port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(name: str, latencies: list[float], total_time: float) -> str:
+    return (
+        f'{name:<32} {len(latencies) / total_time:>10.1f} req/s'
+        f'  p50={percentile(latencies, 0.5) * 1000:.2f}ms'
+        f'  p99={percentile(latencies, 0.99) * 1000:.2f}ms'
+    )
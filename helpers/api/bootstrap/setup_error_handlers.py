@@ -1,12 +1,16 @@
+from collections.abc import Callable
 from functools import partial
 
+import orjson
 from fastapi import FastAPI, status
-from fastapi.exceptions import RequestValidationError, ResponseValidationError as FastAPIResponseValidationError
-from fastapi.responses import UJSONResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.exceptions import ResponseValidationError as FastAPIResponseValidationError
 from pydantic import ValidationError as PydanticValidationError
 from starlette.requests import Request
 from starlette.responses import Response
 
+from helpers.api.responses import ORJSONResponse, RawJSONResponse
+from helpers.errors import BaseError
 from helpers.errors.api import (
     InputValidationError,
     NotFoundError,
@@ -16,6 +20,24 @@ from helpers.errors.api import (
     ValidationError,
 )
 
+_RENDERED_SERVER_ERRORS: dict[type[ServerError], bytes] = {}
+
+
+def _render_server_error(
+    exc: ServerError,
+) -> bytes:
+    error_type = type(exc)
+    # Кэшируется только стандартное тело ошибки: сообщение по умолчанию и без переопределённых title/as_dict
+    if (
+        exc.message != error_type.message
+        or error_type.title is not BaseError.title
+        or error_type.as_dict is not BaseError.as_dict
+    ):
+        return orjson.dumps(exc.as_dict())
+    if (body := _RENDERED_SERVER_ERRORS.get(error_type)) is None:
+        body = _RENDERED_SERVER_ERRORS[error_type] = orjson.dumps(exc.as_dict())
+    return body
+
 
 def process_server_error(
     _request: Request,
@@ -24,27 +46,31 @@ def process_server_error(
     is_debug: bool,
     old_exc: Exception | None = None,
 ) -> Response:
+    if not is_debug:
+        return RawJSONResponse(
+            content=_render_server_error(exc),
+            status_code=exc.status_code,
+        )
+
     if old_exc and not exc.debug:
         exc.debug = str(old_exc)
 
-    response: UJSONResponse = UJSONResponse(
+    return ORJSONResponse(
         content=exc.as_dict(is_debug=is_debug),
         status_code=exc.status_code,
     )
 
-    return response
-
 
 def _redefine_error(
     _request: Request,
     exc: Exception,
-    server_error_instance: ServerError,
+    make_server_error: Callable[[], ServerError],
     *,
     is_debug: bool,
 ) -> Response:
     return process_server_error(
         _request=_request,
-        exc=server_error_instance,
+        exc=make_server_error(),
         is_debug=is_debug,
         old_exc=exc,
     )
@@ -52,7 +78,7 @@ def _redefine_error(
 
 def _make_server_error_instance(
     exc_class_or_status_code: int | type[Exception],
-    server_error_type: type[ServerError],
+    server_error_type: type[ServerError] | None,
 ) -> ServerError:
     if isinstance(exc_class_or_status_code, int):
         debug_info = f'redefined internal http status {exc_class_or_status_code}'
@@ -79,22 +105,14 @@ def _redefine_internal_exception(
     for exc_class_or_status_code in _cast_exc_class_or_status_code_to_list(exc_class_or_status_codes):
         if not server_error_type and isinstance(exc_class_or_status_code, int):
             raise ValueError
-        if not server_error_type:
-            app.add_exception_handler(
-                exc_class_or_status_code=exc_class_or_status_code,
-                handler=partial(
-                    _redefine_error,
-                    is_debug=is_debug,
-                    server_error_instance=exc_class_or_status_codes,  # type: ignore
-                ),
-            )
-            continue
+        # Экземпляр ошибки создаётся на каждый запрос: debug заполняется из исходного исключения
         app.add_exception_handler(
             exc_class_or_status_code=exc_class_or_status_code,
             handler=partial(
                 _redefine_error,
                 is_debug=is_debug,
-                server_error_instance=_make_server_error_instance(
+                make_server_error=partial(
+                    _make_server_error_instance,
                     exc_class_or_status_code=exc_class_or_status_code,
                     server_error_type=server_error_type,
                 ),
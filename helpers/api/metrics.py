@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from helpers.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get('/metrics', include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,35 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Scope, Send
+
+
+def get_raw_header(
+    scope: Scope,
+    name: bytes,
+) -> str | None:
+    for header_name, value in scope['headers']:
+        if header_name == name:
+            return value.decode('latin-1')
+    return None
+
+
+class ResponseStartTracker:
+    """Обёртка над send: отмечает начало ответа и при необходимости дописывает заголовок."""
+
+    def __init__(
+        self,
+        send: Send,
+        header: tuple[str, str] | None = None,
+    ) -> None:
+        self.send = send
+        self.header = header
+        self.started = False
+
+    async def __call__(
+        self,
+        message: Message,
+    ) -> None:
+        if message['type'] == 'http.response.start':
+            self.started = True
+            if self.header is not None:
+                MutableHeaders(scope=message)[self.header[0]] = self.header[1]
+        await self.send(message)
@@ -1,5 +1,6 @@
 __all__ = [
+    'AuthASGIMiddleware',
     'AuthMiddleware',
 ]
 
-from helpers.api.middleware.auth.middleware import AuthMiddleware
+from helpers.api.middleware.auth.middleware import AuthASGIMiddleware, AuthMiddleware
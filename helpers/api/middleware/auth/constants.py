@@ -1,2 +1,7 @@
 DEFAULT_ALGORITHM = 'HS256'
 DEFAULT_TOKEN_HEADER_NAME = 'X-Auth-Token'
+
+AUTH_TOKEN_SCOPE_KEY = 'auth_token'  # noqa: S105
+AUTH_TOKEN_DECODER_SCOPE_KEY = 'auth_token_decoder'  # noqa: S105
+AUTH_TOKEN_PAYLOAD_SCOPE_KEY = 'auth_token_payload'  # noqa: S105
+AUTH_USER_SCOPE_KEY = 'auth_user'
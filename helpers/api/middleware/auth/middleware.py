@@ -1,4 +1,7 @@
 import contextlib
+from collections.abc import Callable
+from functools import partial
+from typing import Any
 
 from fastapi import FastAPI
 from jose import JOSEError
@@ -6,11 +9,73 @@ from pydantic import SecretStr
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from helpers.api.middleware.auth.constants import DEFAULT_ALGORITHM, DEFAULT_TOKEN_HEADER_NAME
+from helpers.api.middleware.asgi import get_raw_header
+from helpers.api.middleware.auth.constants import (
+    AUTH_TOKEN_DECODER_SCOPE_KEY,
+    AUTH_TOKEN_PAYLOAD_SCOPE_KEY,
+    AUTH_TOKEN_SCOPE_KEY,
+    DEFAULT_ALGORITHM,
+    DEFAULT_TOKEN_HEADER_NAME,
+)
+from helpers.api.middleware.auth.token_cache import (
+    VERIFIED_TOKEN_CACHE,
+    VerifiedTokenCache,
+)
 from helpers.jwt import decode_jwt
 
 
+def decode_auth_token(
+    token: str,
+    key: SecretStr,
+    algorithm: str,
+    token_cache: VerifiedTokenCache | None = None,
+) -> dict[str, Any] | None:
+    if token_cache is None:
+        with contextlib.suppress(JOSEError):
+            return decode_jwt(token, key.get_secret_value(), algorithm)
+        return None
+
+    cache_key = token_cache.make_key(token, key.get_secret_value(), algorithm)
+    if (payload := token_cache.get(cache_key)) is not None:
+        return payload
+    with contextlib.suppress(JOSEError):
+        payload = decode_jwt(token, key.get_secret_value(), algorithm)
+        token_cache.set(cache_key, dict(payload))
+    return payload
+
+
+TokenDecoder = Callable[[str], dict[str, Any] | None]
+
+
+def store_auth_token(
+    scope: Scope,
+    token: str,
+    decoder: TokenDecoder,
+    *,
+    lazy: bool,
+) -> None:
+    # В ленивом режиме токен разбирают зависимости из helpers.depends.auth при первом обращении
+    if lazy:
+        scope[AUTH_TOKEN_SCOPE_KEY] = token
+        scope[AUTH_TOKEN_DECODER_SCOPE_KEY] = decoder
+    elif (payload := decoder(token)) is not None:
+        scope[AUTH_TOKEN_PAYLOAD_SCOPE_KEY] = payload
+
+
+def get_auth_token_payload(
+    scope: Scope,
+) -> dict[str, Any] | None:
+    if AUTH_TOKEN_PAYLOAD_SCOPE_KEY in scope:
+        return scope[AUTH_TOKEN_PAYLOAD_SCOPE_KEY]
+    token = scope.get(AUTH_TOKEN_SCOPE_KEY)
+    decoder = scope.get(AUTH_TOKEN_DECODER_SCOPE_KEY)
+    payload = decoder(token) if token and decoder else None
+    scope[AUTH_TOKEN_PAYLOAD_SCOPE_KEY] = payload
+    return payload
+
+
 class AuthMiddleware(BaseHTTPMiddleware):
     def __init__(
         self,
@@ -18,18 +83,64 @@ class AuthMiddleware(BaseHTTPMiddleware):
         key: SecretStr,
         algorithm: str = DEFAULT_ALGORITHM,
         token_header_name: str = DEFAULT_TOKEN_HEADER_NAME,  # noqa: S107
+        token_cache: VerifiedTokenCache | None = VERIFIED_TOKEN_CACHE,
+        *,
+        lazy: bool = False,
     ) -> None:
         super().__init__(app=app)
         self.token_header_name = token_header_name
         self.key = key
         self.algorithm = algorithm
+        self.token_cache = token_cache
+        self.lazy = lazy
+        self._decoder: TokenDecoder = partial(
+            decode_auth_token,
+            key=key,
+            algorithm=algorithm,
+            token_cache=token_cache,
+        )
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         token = request.headers.get(self.token_header_name, '')
 
-        with contextlib.suppress(JOSEError):
-            payload = decode_jwt(token, self.key.get_secret_value(), self.algorithm)
-            request.scope['auth_token_payload'] = payload
+        store_auth_token(request.scope, token, self._decoder, lazy=self.lazy)
 
         response = await call_next(request)
         return response
+
+
+class AuthASGIMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        key: SecretStr,
+        algorithm: str = DEFAULT_ALGORITHM,
+        token_header_name: str = DEFAULT_TOKEN_HEADER_NAME,  # noqa: S107
+        token_cache: VerifiedTokenCache | None = VERIFIED_TOKEN_CACHE,
+        *,
+        lazy: bool = False,
+    ) -> None:
+        self.app = app
+        self.token_header_name = token_header_name
+        self.key = key
+        self.algorithm = algorithm
+        self.token_cache = token_cache
+        self.lazy = lazy
+        self._decoder: TokenDecoder = partial(
+            decode_auth_token,
+            key=key,
+            algorithm=algorithm,
+            token_cache=token_cache,
+        )
+        self._raw_token_header_name = token_header_name.lower().encode('latin-1')
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] == 'http' and (token := get_raw_header(scope, self._raw_token_header_name)):
+            store_auth_token(scope, token, self._decoder, lazy=self.lazy)
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+from typing import Any
+
+from helpers.metrics import Counter
+
+AUTH_TOKEN_CACHE_REQUESTS = Counter(
+    'auth_token_cache_requests_total',
+    'Verified auth token cache lookups',
+    ('result',),
+)
+
+
+class VerifiedTokenCache:
+    """LRU-кэш уже проверенных JWT.
+
+    Ключ - хэш токена вместе с ключом подписи и алгоритмом, поэтому после смены ключа старые записи
+    просто перестают находиться. Запись живёт не дольше exp токена и не дольше max_ttl.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_ttl: float = 300,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(
+        self,
+    ) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def make_key(
+        token: str,
+        key: str,
+        algorithm: str,
+    ) -> bytes:
+        return sha256(f'{algorithm}\x00{key}\x00{token}'.encode()).digest()
+
+    def get(
+        self,
+        cache_key: bytes,
+    ) -> dict[str, Any] | None:
+        if (item := self._entries.get(cache_key)) is None or item[1] <= time():
+            if item is not None:
+                del self._entries[cache_key]
+            self.misses += 1
+            AUTH_TOKEN_CACHE_REQUESTS.inc(('miss',))
+            return None
+        self._entries.move_to_end(cache_key)
+        self.hits += 1
+        AUTH_TOKEN_CACHE_REQUESTS.inc(('hit',))
+        return dict(item[0])
+
+    def set(
+        self,
+        cache_key: bytes,
+        payload: dict[str, Any],
+    ) -> None:
+        expires_at = time() + self.max_ttl
+        if isinstance(exp := payload.get('exp'), int | float):
+            expires_at = min(expires_at, exp)
+        if expires_at <= time():
+            return
+        self._entries[cache_key] = (payload, expires_at)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(
+        self,
+    ) -> None:
+        self._entries.clear()
+
+
+VERIFIED_TOKEN_CACHE = VerifiedTokenCache()
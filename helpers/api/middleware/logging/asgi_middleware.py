@@ -0,0 +1,207 @@
+import re
+from collections.abc import Sequence
+from contextlib import suppress
+from time import time
+from typing import Any
+from urllib.parse import parse_qsl
+
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from helpers.api.middleware.logging.constants import (
+    DEFAULT_LOGGING_MAX_BODY_SIZE,
+    LOGGING_REQUEST_METHODS_WITHOUT_BODY,
+    LOGGING_SUBSTRINGS_OF_ROUTES_FOR_SKIP,
+)
+from helpers.clients.body_capture import BodyCapture, describe_body
+from helpers.errors import ServerError
+from helpers.json import dump_json
+from helpers.log_pipeline import emit_log_record
+
+_CONTENT_DISPOSITION_PARAM_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+
+def _parse_multipart_metadata(
+    body: bytes,
+    boundary: bytes,
+) -> dict[str, Any]:
+    fields: list[str] = []
+    files: list[dict[str, str | None]] = []
+    for part in body.split(b'--' + boundary)[1:]:
+        head, separator, _ = part.partition(b'\r\n\r\n')
+        if not separator:
+            continue
+        part_headers = Headers(
+            raw=[
+                (name.strip().lower(), value.strip())
+                for name, _, value in (line.partition(b':') for line in head.strip().split(b'\r\n'))
+            ],
+        )
+        params = dict(_CONTENT_DISPOSITION_PARAM_PATTERN.findall(part_headers.get('content-disposition', '')))
+        if 'filename' in params:
+            files.append(
+                {
+                    'field': params.get('name'),
+                    'filename': params['filename'],
+                    'content_type': part_headers.get('content-type'),
+                },
+            )
+        elif 'name' in params:
+            fields.append(params['name'])
+    return {'fields': fields, 'files': files}
+
+
+def _get_multipart_boundary(
+    content_type: str,
+) -> bytes | None:
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'boundary':
+            return value.strip('"').encode()
+    return None
+
+
+def parse_input_data(
+    http_method: str,
+    query_string: bytes,
+    headers: Headers,
+    body: BodyCapture,
+) -> str | None:
+    input_data: dict[str, Any] | None = None
+    content_type = headers.get('content-type', '')
+
+    if body.size and http_method not in LOGGING_REQUEST_METHODS_WITHOUT_BODY:
+        data = bytes(body.data)
+        if content_type.startswith('multipart/form-data'):
+            if boundary := _get_multipart_boundary(content_type):
+                input_data = _parse_multipart_metadata(data, boundary)
+            if body.truncated:
+                input_data = {**(input_data or {}), 'truncated': True, 'size': body.size}
+        elif content_type.startswith('application/x-www-form-urlencoded') and not body.truncated:
+            input_data = dict(parse_qsl(data.decode(errors='replace')))
+        elif 'json' in content_type and not body.truncated:
+            with suppress(orjson.JSONDecodeError):
+                parsed = orjson.loads(data)
+                input_data = parsed if isinstance(parsed, dict) else {'body': parsed}
+        if input_data is None:
+            input_data = {'body': describe_body(body, headers)}
+
+    if query_string:
+        input_data = input_data or {}
+        input_data.update(parse_qsl(query_string.decode(errors='replace')))
+
+    return dump_json(input_data) if input_data else None
+
+
+class LoggingASGIMiddleware:
+    """ASGI-аналог FastAPILoggingMiddleware: тело запроса и ответа копируется в буфер ограниченного размера.
+
+    Разбор буферов выполняется лениво, только если запись действительно попадает в лог.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        destination: str = 'UNSET',
+        logging_substrings_of_routes_for_skip: Sequence[str] = tuple(LOGGING_SUBSTRINGS_OF_ROUTES_FOR_SKIP),
+        max_body_size: int = DEFAULT_LOGGING_MAX_BODY_SIZE,
+    ) -> None:
+        self.app = app
+        self.destination = destination
+        self.logging_substrings_of_routes_for_skip = logging_substrings_of_routes_for_skip
+        self.max_body_size = max_body_size
+
+    def _is_skipped(
+        self,
+        path: str,
+    ) -> bool:
+        return any(substring in path for substring in self.logging_substrings_of_routes_for_skip)
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] != 'http' or self._is_skipped(scope['path']):
+            await self.app(scope, receive, send)
+            return
+
+        request_body = BodyCapture(self.max_body_size)
+        response_body = BodyCapture(self.max_body_size)
+        response_start: Message | None = None
+        error: Exception | None = None
+        start_time = time()
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_body.feed(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_start
+            if message['type'] == 'http.response.start':
+                response_start = message
+            elif message['type'] == 'http.response.body':
+                response_body.feed(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            processing_time = time() - start_time
+            with suppress(Exception):
+                await emit_log_record(
+                    lambda: self._make_record(
+                        scope=scope,
+                        response_start=response_start,
+                        request_body=request_body,
+                        response_body=response_body,
+                        processing_time=processing_time,
+                        error=error,
+                    ),
+                )
+
+    def _make_record(
+        self,
+        scope: Scope,
+        response_start: Message | None,
+        request_body: BodyCapture,
+        response_body: BodyCapture,
+        processing_time: float,
+        error: Exception | None,
+    ) -> dict[str, Any]:
+        request_headers = Headers(scope=scope)
+        response_headers = Headers(raw=response_start['headers']) if response_start else None
+        http_status_code = response_start['status'] if response_start else None
+        if http_status_code is None and isinstance(error, ServerError):
+            http_status_code = error.status_code
+
+        error_title = error_message = None
+        if error:
+            error_title = error.title if isinstance(error, ServerError) else error.__class__.__name__
+            error_message = error.message if isinstance(error, ServerError) else str(error)
+
+        return {
+            'destination': self.destination,
+            'http_method': scope['method'].upper(),
+            'method': scope['path'],
+            'processing_time': processing_time,
+            'http_status_code': http_status_code,
+            'input_data': parse_input_data(
+                scope['method'].upper(),
+                scope.get('query_string', b''),
+                request_headers,
+                request_body,
+            ),
+            'output_data': describe_body(response_body, response_headers),
+            'request_headers': dump_json(dict(request_headers)),
+            'response_headers': dump_json(dict(response_headers)) if response_headers is not None else None,
+            'error_title': error_title,
+            'error_message': error_message,
+        }
@@ -1,2 +1,3 @@
 LOGGING_REQUEST_METHODS_WITHOUT_BODY = {'GET', 'DELETE'}
 LOGGING_SUBSTRINGS_OF_ROUTES_FOR_SKIP = {'metrics', 'health', 'docs'}
+DEFAULT_LOGGING_MAX_BODY_SIZE = 4096
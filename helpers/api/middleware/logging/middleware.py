@@ -3,13 +3,16 @@ from collections.abc import Awaitable, Callable, Sequence
 from contextlib import suppress
 from time import time
 
-from loguru import logger
-
 from helpers.api.middleware.logging.constants import (
     LOGGING_SUBSTRINGS_OF_ROUTES_FOR_SKIP,
 )
-from helpers.api.middleware.logging.request_wrappers import FastAPIRequestWrapper, FastAPIResponseWrapper
+from helpers.api.middleware.logging.policy import DEFAULT_LOGGING_POLICY, LoggingPolicy
+from helpers.api.middleware.logging.request_wrappers import (
+    FastAPIRequestWrapper,
+    FastAPIResponseWrapper,
+)
 from helpers.errors import ServerError
+from helpers.log_pipeline import emit_log_record
 
 
 class LoggingMiddlewareBase(
@@ -20,12 +23,42 @@ class LoggingMiddlewareBase(
     logging_substrings_of_routes_for_skip: Sequence[str] = ()
     destination: str = 'UNSET'
 
+    def __init__(
+        self,
+        policy: LoggingPolicy = DEFAULT_LOGGING_POLICY,
+        route_path: str | None = None,
+    ) -> None:
+        self.policy = policy
+        self._route_path = route_path
+        self._route_skipped: bool | None = None
+
+    def _is_skipped(
+        self,
+        path: str,
+    ) -> bool:
+        return any(substring in path for substring in self.logging_substrings_of_routes_for_skip)
+
+    def _is_route_skipped(
+        self,
+    ) -> bool:
+        # Маршруты собираются раньше setup_logger_middleware, поэтому подстроки проверяются на первом запросе
+        if self._route_path is None:
+            return False
+        if self._route_skipped is None:
+            self._route_skipped = self._is_skipped(self._route_path)
+        return self._route_skipped
+
     async def __call__(
         self,
         request: object,
         call_next: Callable[[object], Awaitable[object]],
     ) -> object:
+        if self.policy.skip or self._is_route_skipped():
+            return await call_next(request)
         wrapped_request: FastAPIRequestWrapper = self.request_cls(request)  # type: ignore
+        if self._route_path is None and self._is_skipped(wrapped_request.path):
+            return await call_next(request)
+
         wrapped_response: FastAPIResponseWrapper | None = None  # type: ignore
         http_status_code = None
         start_time = time()
@@ -45,32 +78,54 @@ class LoggingMiddlewareBase(
             error = exc  # type: ignore
             raise
         finally:
+            processing_time = time() - start_time
             with suppress(Exception):
-                if error:
-                    error_title = error.title if isinstance(error, ServerError) else error.__class__.__name__
-                    error_message = error.message if isinstance(error, ServerError) else str(error)
-
-                if not any(
-                    substring
-                    for substring in self.logging_substrings_of_routes_for_skip
-                    if substring in wrapped_request.path
-                ):
-                    logger.info(
-                        {
-                            'destination': self.destination,
-                            'http_method': wrapped_request.http_method,
-                            'method': wrapped_request.method,
-                            'processing_time': time() - start_time,
-                            'http_status_code': http_status_code,
-                            'input_data': await wrapped_request.get_input_data(),
-                            'output_data': wrapped_response.output_data if wrapped_response else None,
-                            'request_headers': wrapped_request.headers,
-                            'response_headers': wrapped_response.headers if wrapped_response else None,
-                            'error_title': error_title,
-                            'error_message': error_message,
-                        },
+                if self.policy.should_log(processing_time, http_status_code, has_error=error is not None):
+                    await self._log(
+                        wrapped_request=wrapped_request,
+                        wrapped_response=wrapped_response,
+                        http_status_code=http_status_code,
+                        processing_time=processing_time,
+                        error=error,
                     )
 
+    async def _log(
+        self,
+        wrapped_request: FastAPIRequestWrapper,
+        wrapped_response: FastAPIResponseWrapper | None,
+        http_status_code: int | None,
+        processing_time: float,
+        error: Exception | None,
+    ) -> None:
+        error_title = error_message = None
+        if error:
+            error_title = error.title if isinstance(error, ServerError) else error.__class__.__name__
+            error_message = error.message if isinstance(error, ServerError) else str(error)
+
+        input_data = output_data = None
+        if self.policy.capture_body:
+            max_body_size = self.policy.max_body_size
+            input_data = self.policy.cut_body(await wrapped_request.get_input_data(max_body_size))
+            output_data = self.policy.cut_body(
+                wrapped_response.get_output_data(max_body_size) if wrapped_response else None
+            )
+
+        await emit_log_record(
+            {
+                'destination': self.destination,
+                'http_method': wrapped_request.http_method,
+                'method': wrapped_request.method,
+                'processing_time': processing_time,
+                'http_status_code': http_status_code,
+                'input_data': input_data,
+                'output_data': output_data,
+                'request_headers': wrapped_request.headers,
+                'response_headers': wrapped_response.headers if wrapped_response else None,
+                'error_title': error_title,
+                'error_message': error_message,
+            },
+        )
+
 
 class FastAPILoggingMiddleware(
     LoggingMiddlewareBase,
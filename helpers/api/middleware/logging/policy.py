@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from random import random
+from typing import Any
+
+LOGGING_POLICY_ATTRIBUTE = '__logging_policy__'
+
+
+class LoggingPolicy:
+    def __init__(
+        self,
+        *,
+        skip: bool = False,
+        sample_rate: float = 1.0,
+        capture_body: bool = True,
+        max_body_size: int | None = None,
+        only_errors: bool = False,
+        slow_threshold: float | None = None,
+    ) -> None:
+        self.skip = skip
+        self.sample_rate = sample_rate
+        self.capture_body = capture_body
+        self.max_body_size = max_body_size
+        self.only_errors = only_errors
+        self.slow_threshold = slow_threshold
+        # Для политики по умолчанию проверка сводится к одной ветке
+        self.always_log = sample_rate >= 1 and not only_errors
+
+    def should_log(
+        self,
+        processing_time: float,
+        http_status_code: int | None,
+        has_error: bool,
+    ) -> bool:
+        if self.always_log or has_error or (http_status_code is not None and http_status_code >= 400):  # noqa: PLR2004
+            return True
+        if self.slow_threshold is not None and processing_time >= self.slow_threshold:
+            return True
+        return not self.only_errors and random() < self.sample_rate  # noqa: S311
+
+    def cut_body(
+        self,
+        data: str | None,
+    ) -> str | None:
+        if not self.capture_body:
+            return None
+        if data is not None and self.max_body_size is not None and len(data) > self.max_body_size:
+            return f'{data[: self.max_body_size]}... (truncated, {len(data)} chars)'
+        return data
+
+
+DEFAULT_LOGGING_POLICY = LoggingPolicy()
+
+
+def logging_policy(
+    **kwargs: Any,
+) -> Callable:  # type: ignore
+    policy = LoggingPolicy(**kwargs)
+
+    def _wrapper(
+        endpoint: Callable,  # type: ignore
+    ) -> Callable:  # type: ignore
+        setattr(endpoint, LOGGING_POLICY_ATTRIBUTE, policy)
+        return endpoint
+
+    return _wrapper
+
+
+def get_logging_policy(
+    endpoint: Callable[..., Any],
+    default: LoggingPolicy = DEFAULT_LOGGING_POLICY,
+) -> LoggingPolicy:
+    return getattr(endpoint, LOGGING_POLICY_ATTRIBUTE, default)
@@ -25,11 +25,26 @@ class FastAPIRequestWrapper:
     ) -> str | None:
         return dump_json(dict(self._request_object.headers))
 
+    def get_body_size(
+        self,
+    ) -> int | None:
+        with suppress(ValueError):
+            if (content_length := self._request_object.headers.get('content-length')) is not None:
+                return int(content_length)
+        body = getattr(self._request_object, '_body', None)
+        return len(body) if body is not None else None
+
     async def get_input_data(
         self,
+        max_body_size: int | None = None,
     ) -> str | None:
         input_data = None
-        if self._request_object.method.upper() not in LOGGING_REQUEST_METHODS_WITHOUT_BODY:
+        # Размер известен до разбора тела: слишком большое тело не читается в JSON и не разбирается как форма
+        body_size = self.get_body_size()
+        parse_body = max_body_size is None or body_size is None or body_size <= max_body_size
+        if not parse_body:
+            input_data = {'truncated': True, 'size': body_size}
+        elif self._request_object.method.upper() not in LOGGING_REQUEST_METHODS_WITHOUT_BODY:
             with suppress(
                 UnicodeDecodeError,
                 RuntimeError,
@@ -40,7 +55,7 @@ class FastAPIRequestWrapper:
             input_data = input_data or {}
             input_data.update(params._dict)  # noqa
 
-        if form := await self._request_object.form():
+        if parse_body and (form := await self._request_object.form()):
             input_data = input_data or {}
             form_file_names = []
             for item in form._list:
@@ -87,10 +102,18 @@ class FastAPIResponseWrapper:
     @property
     def output_data(
         self,
+    ) -> str | None:
+        return self.get_output_data()
+
+    def get_output_data(
+        self,
+        max_body_size: int | None = None,
     ) -> str | None:
         output_data = None
         if not self._response_object.body:
             return output_data
+        if max_body_size is not None and len(self._response_object.body) > max_body_size:
+            return dump_json({'truncated': True, 'size': len(self._response_object.body)})
         with suppress(
             UnicodeDecodeError,
         ):
@@ -0,0 +1,5 @@
+__all__ = [
+    'RequestContextMiddleware',
+]
+
+from helpers.api.middleware.request_context.middleware import RequestContextMiddleware
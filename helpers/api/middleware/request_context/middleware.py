@@ -0,0 +1,91 @@
+from functools import partial
+from uuid import uuid4
+
+from pydantic import SecretStr
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from helpers.api.middleware.asgi import ResponseStartTracker
+from helpers.api.middleware.auth.constants import (
+    DEFAULT_ALGORITHM,
+    DEFAULT_TOKEN_HEADER_NAME,
+)
+from helpers.api.middleware.auth.middleware import (
+    TokenDecoder,
+    decode_auth_token,
+    store_auth_token,
+)
+from helpers.api.middleware.auth.token_cache import (
+    VERIFIED_TOKEN_CACHE,
+    VerifiedTokenCache,
+)
+from helpers.api.middleware.trace_id.constants import DEFAULT_TRACE_ID_HEADER_NAME
+from helpers.api.middleware.unexpected_errors.middleware import make_error_response
+from helpers.contextvars import TRACE_ID
+
+
+class RequestContextMiddleware:
+    """Замена связки TraceIdMiddleware, AuthMiddleware и ErrorsHandlerMiddleware одним ASGI-слоем.
+
+    Заголовки запроса просматриваются один раз. Поведение совпадает со стеком, где TraceIdMiddleware
+    внешний, а ErrorsHandlerMiddleware внутренний: trace id проставляется и в ответы с ошибкой.
+    Без key токен не разбирается, с lazy_auth разбор откладывается до зависимостей авторизации.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        key: SecretStr | None = None,
+        algorithm: str = DEFAULT_ALGORITHM,
+        token_header_name: str = DEFAULT_TOKEN_HEADER_NAME,  # noqa: S107
+        trace_id_header_name: str = DEFAULT_TRACE_ID_HEADER_NAME,
+        token_cache: VerifiedTokenCache | None = VERIFIED_TOKEN_CACHE,
+        *,
+        is_debug: bool = False,
+        lazy_auth: bool = False,
+    ) -> None:
+        self.app = app
+        self.key = key
+        self.algorithm = algorithm
+        self.token_header_name = token_header_name
+        self.trace_id_header_name = trace_id_header_name
+        self.is_debug = is_debug
+        self.token_cache = token_cache
+        self.lazy_auth = lazy_auth
+        self._decoder: TokenDecoder | None = None
+        if key is not None:
+            self._decoder = partial(decode_auth_token, key=key, algorithm=algorithm, token_cache=token_cache)
+        self._raw_token_header_name = token_header_name.lower().encode('latin-1')
+        self._raw_trace_id_header_name = trace_id_header_name.lower().encode('latin-1')
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        current_trace = token = None
+        for name, value in scope['headers']:
+            if name == self._raw_trace_id_header_name and current_trace is None:
+                current_trace = value.decode('latin-1')
+            elif name == self._raw_token_header_name and token is None:
+                token = value.decode('latin-1')
+
+        if current_trace is None:
+            current_trace = str(uuid4())
+        TRACE_ID.set(current_trace)
+
+        if self._decoder is not None and token:
+            store_auth_token(scope, token, self._decoder, lazy=self.lazy_auth)
+
+        tracked_send = ResponseStartTracker(send, (self.trace_id_header_name, current_trace))
+        try:
+            await self.app(scope, receive, tracked_send)
+        except Exception as exc:
+            if tracked_send.started:
+                raise
+            await make_error_response(Request(scope), exc, is_debug=self.is_debug)(scope, receive, tracked_send)
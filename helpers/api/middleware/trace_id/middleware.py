@@ -4,7 +4,9 @@ from fastapi import FastAPI
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from helpers.api.middleware.asgi import ResponseStartTracker, get_raw_header
 from helpers.api.middleware.trace_id.constants import DEFAULT_TRACE_ID_HEADER_NAME
 from helpers.contextvars import TRACE_ID
 
@@ -26,3 +28,31 @@ class TraceIdMiddleware(BaseHTTPMiddleware):
 
         response.headers[self.trace_id_header_name] = current_trace
         return response
+
+
+class TraceIdASGIMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        trace_id_header_name: str = DEFAULT_TRACE_ID_HEADER_NAME,
+    ) -> None:
+        self.app = app
+        self.trace_id_header_name = trace_id_header_name
+        self._raw_trace_id_header_name = trace_id_header_name.lower().encode('latin-1')
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        current_trace = get_raw_header(scope, self._raw_trace_id_header_name)
+        if current_trace is None:
+            current_trace = str(uuid4())
+        TRACE_ID.set(current_trace)
+
+        await self.app(scope, receive, ResponseStartTracker(send, (self.trace_id_header_name, current_trace)))
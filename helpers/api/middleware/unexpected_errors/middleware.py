@@ -4,12 +4,33 @@ from typing import Any
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from helpers.api.bootstrap.setup_error_handlers import process_server_error
+from helpers.api.middleware.asgi import ResponseStartTracker
 from helpers.errors import ServerError
 
 
+def make_error_response(
+    request: Request,
+    exc: Exception,
+    *,
+    is_debug: bool,
+) -> Response:
+    if isinstance(exc, ServerError):
+        return process_server_error(
+            _request=request,
+            exc=exc,
+            is_debug=is_debug,
+        )
+    print_exc()
+    return process_server_error(
+        _request=request,
+        exc=ServerError(debug=format_exc()),
+        is_debug=is_debug,
+    )
+
+
 class ErrorsHandlerMiddleware(BaseHTTPMiddleware):
     def __init__(
         self,
@@ -26,16 +47,34 @@ class ErrorsHandlerMiddleware(BaseHTTPMiddleware):
     ) -> Response:
         try:
             return await call_next(request)
-        except ServerError as exc:
-            return process_server_error(
-                _request=request,
-                exc=exc,
-                is_debug=self.is_debug,
-            )
-        except Exception:
-            print_exc()
-            return process_server_error(
-                _request=request,
-                exc=ServerError(debug=format_exc()),
-                is_debug=self.is_debug,
-            )
+        except Exception as exc:
+            return make_error_response(request, exc, is_debug=self.is_debug)
+
+
+class ErrorsHandlerASGIMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        **kwargs: Any,
+    ) -> None:
+        self.app = app
+        self.is_debug = kwargs.get('is_debug', False)
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        tracked_send = ResponseStartTracker(send)
+        try:
+            await self.app(scope, receive, tracked_send)
+        except Exception as exc:
+            # Если ответ уже начал отправляться, заменить его нельзя
+            if tracked_send.started:
+                raise
+            await make_error_response(Request(scope), exc, is_debug=self.is_debug)(scope, receive, send)
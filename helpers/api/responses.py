@@ -0,0 +1,75 @@
+from collections.abc import AsyncIterable, Iterable
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Row
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+
+class ORJSONResponse(JSONResponse):
+    def render(
+        self,
+        content: Any,
+    ) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RawJSONResponse(Response):
+    """Ответ с уже сериализованным JSON: тело передаётся байтами как есть."""
+
+    media_type = 'application/json'
+
+
+def _serialize_pydantic_model(
+    obj: Any,
+) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json', by_alias=True)
+    raise TypeError
+
+
+class PydanticJSONResponse(ORJSONResponse):
+    """Модель Pydantic сериализуется сразу в байты своим скомпилированным сериализатором, остальное - orjson.
+
+    FastAPILoggingRoute отдаёт сюда модель, которую вернул обработчик, минуя jsonable_encoder.
+    """
+
+    def render(
+        self,
+        content: Any,
+    ) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(content, default=_serialize_pydantic_model, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _dump_ndjson_item(
+    item: Any,
+) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.__pydantic_serializer__.to_json(item, by_alias=True)
+    if isinstance(item, Row):
+        item = item._asdict()
+    return orjson.dumps(item, default=_serialize_pydantic_model, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def _encode_ndjson_chunks(
+    chunks: AsyncIterable[Iterable[Any]],
+) -> AsyncIterable[bytes]:
+    async for chunk in chunks:
+        if body := b''.join(_dump_ndjson_item(item) + b'\n' for item in chunk):
+            yield body
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Потоковый ответ application/x-ndjson: каждая пачка элементов отправляется одним куском тела."""
+
+    media_type = 'application/x-ndjson'
+
+    def __init__(
+        self,
+        chunks: AsyncIterable[Iterable[Any]],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(_encode_ndjson_chunks(chunks), **kwargs)
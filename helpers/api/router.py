@@ -1,39 +1,137 @@
 from collections.abc import Callable, Coroutine
-from functools import partial
-from typing import Any
+from functools import partial, wraps
+from inspect import iscoroutinefunction, isfunction, isgeneratorfunction
+from typing import Any, ClassVar
 
 from fastapi import APIRouter
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.models import Dependant
 from fastapi.responses import UJSONResponse
 from fastapi.routing import APIRoute
+from pydantic import BaseModel
 from starlette.requests import Request
 from starlette.responses import Response
 
 from helpers.api.middleware.logging.middleware import FastAPILoggingMiddleware
+from helpers.api.middleware.logging.policy import (
+    DEFAULT_LOGGING_POLICY,
+    LoggingPolicy,
+    get_logging_policy,
+)
+from helpers.api.responses import PydanticJSONResponse
+
+
+def _uses_response_parameter(
+    dependant: Dependant,
+) -> bool:
+    return dependant.response_param_name is not None or any(
+        _uses_response_parameter(dependency) for dependency in dependant.dependencies
+    )
 
 
 class FastAPILoggingRoute(
     APIRoute,
 ):
+    direct_model_response: ClassVar[bool] = False
+    # Политика роутера по умолчанию; декоратор logging_policy на обработчике её переопределяет
+    logging_policy: ClassVar[LoggingPolicy] = DEFAULT_LOGGING_POLICY
+
     def get_route_handler(
         self,
     ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
-        middleware = FastAPILoggingMiddleware()
+        if self.direct_model_response:
+            self._enable_direct_model_response()
         original_route_handler = super().get_route_handler()
+        policy = get_logging_policy(self.endpoint, default=self.logging_policy)
+        if policy.skip:
+            return original_route_handler
+        middleware = FastAPILoggingMiddleware(policy=policy, route_path=self.path)
         return partial(  # type: ignore
             middleware,
             call_next=original_route_handler,  # type: ignore
         )
 
+    def _enable_direct_model_response(
+        self,
+    ) -> None:
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        call = self.dependant.call
+        if (
+            call is None
+            # Без response_model FastAPI не валидирует ответ, и модель нельзя отдавать как есть
+            or self.response_model is None
+            or not issubclass(response_class, PydanticJSONResponse)
+            or self.response_model_include is not None
+            or self.response_model_exclude is not None
+            or self.response_model_exclude_unset
+            or self.response_model_exclude_defaults
+            or self.response_model_exclude_none
+            or not self.response_model_by_alias
+            # Заголовки и cookie из параметра Response FastAPI добавляет только в ответ, который строит сам
+            or _uses_response_parameter(self.dependant)
+            or not isfunction(call)
+            or isgeneratorfunction(call)
+        ):
+            return
+
+        response_model = self.response_model
+        status_code = self.status_code or 200
+
+        def _to_response(
+            result: Any,
+        ) -> Any:
+            # Отдаётся только модель ровно того типа, что объявлен: у наследника могут быть лишние поля
+            if isinstance(result, BaseModel) and type(result) is response_model:
+                return response_class(result, status_code=status_code)
+            return result
+
+        if iscoroutinefunction(call):
+
+            @wraps(call)
+            async def _async_endpoint(*args: Any, **kwargs: Any) -> Any:
+                return _to_response(await call(*args, **kwargs))
+
+            self.dependant.call = _async_endpoint
+        else:
+
+            @wraps(call)
+            def _sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+                return _to_response(call(*args, **kwargs))
+
+            self.dependant.call = _sync_endpoint
+
+
+class FastAPIDirectModelRoute(
+    FastAPILoggingRoute,
+):
+    """Маршрут, который отдаёт модель ровно объявленного response_model без повторной валидации FastAPI."""
+
+    direct_model_response = True
+
 
 class FastAPILoggingRouter(APIRouter):
     route_class = FastAPILoggingRoute
     default_response_class = UJSONResponse
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        *args: Any,
+        logging_policy: LoggingPolicy | None = None,
+        direct_model_response: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        self.logging_policy = logging_policy
         if not kwargs.get('default_response_class'):
-            kwargs['default_response_class'] = UJSONResponse
+            kwargs['default_response_class'] = PydanticJSONResponse if direct_model_response else UJSONResponse
 
         if not kwargs.get('route_class'):
-            kwargs['route_class'] = FastAPILoggingRoute
+            kwargs['route_class'] = FastAPIDirectModelRoute if direct_model_response else FastAPILoggingRoute
+
+        # Политика хранится в классе маршрута, чтобы пережить include_router в родительский роутер
+        route_class = kwargs['route_class']
+        if logging_policy is not None and issubclass(route_class, FastAPILoggingRoute):
+            kwargs['route_class'] = type(route_class.__name__, (route_class,), {'logging_policy': logging_policy})
 
         super().__init__(*args, **kwargs)
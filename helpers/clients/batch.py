@@ -0,0 +1,41 @@
+from typing import Any
+
+from httpx import Response
+
+
+class BatchRequest:
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        key: Any = None,
+        **kwargs: Any,
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.key = key if key is not None else url
+        self.kwargs = kwargs
+
+
+class BatchResult:
+    def __init__(
+        self,
+        request: BatchRequest,
+        response: Response | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        self.request = request
+        self.response = response
+        self.error = error
+
+    @property
+    def key(
+        self,
+    ) -> Any:
+        return self.request.key
+
+    @property
+    def is_success(
+        self,
+    ) -> bool:
+        return self.error is None and self.response is not None and self.response.is_success
@@ -0,0 +1,127 @@
+import re
+import zlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from httpx import AsyncByteStream, Headers
+
+DEFAULT_BODY_CAPTURE_LIMIT = 4096
+TEXT_CONTENT_TYPE_MARKERS = ('text/', 'json', 'xml', 'x-www-form-urlencoded', 'javascript', 'yaml', 'csv')
+DECOMPRESSIBLE_CONTENT_ENCODINGS = {'gzip', 'deflate'}
+BASE64_MIN_LENGTH = 64
+_BASE64_PATTERN = re.compile(rb'[A-Za-z0-9+/_-]+={0,2}\s*')
+
+
+class BodyCapture:
+    def __init__(
+        self,
+        limit: int,
+    ) -> None:
+        self.limit = limit
+        self.data = bytearray()
+        self.size = 0
+
+    def feed(
+        self,
+        chunk: bytes,
+    ) -> None:
+        self.size += len(chunk)
+        if (free_space := self.limit - len(self.data)) > 0:
+            self.data += chunk[:free_space]
+
+    @property
+    def truncated(
+        self,
+    ) -> bool:
+        return self.size > len(self.data)
+
+
+class CapturingAsyncByteStream(
+    AsyncByteStream,
+):
+    def __init__(
+        self,
+        stream: AsyncByteStream,
+        capture: BodyCapture,
+        on_close: Callable[[BodyCapture], Awaitable[None]] | None = None,
+    ) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+        self.capture = capture
+
+    async def __aiter__(
+        self,
+    ) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self.capture.feed(chunk)
+            yield chunk
+
+    async def aclose(
+        self,
+    ) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close:
+                await self._on_close(self.capture)
+
+
+def is_text_content_type(
+    content_type: str | None,
+) -> bool:
+    if not content_type:
+        return True
+    content_type = content_type.lower()
+    return any(marker in content_type for marker in TEXT_CONTENT_TYPE_MARKERS)
+
+
+def looks_like_base64(
+    data: bytes,
+) -> bool:
+    return len(data) >= BASE64_MIN_LENGTH and _BASE64_PATTERN.fullmatch(data) is not None
+
+
+def _decompress_prefix(
+    data: bytes,
+    content_encoding: str,
+    limit: int,
+) -> bytes | None:
+    if content_encoding not in DECOMPRESSIBLE_CONTENT_ENCODINGS:
+        return None
+    # MAX_WBITS | 32 автоматически определяет заголовок gzip/zlib
+    wbits = zlib.MAX_WBITS | 32 if content_encoding == 'gzip' else zlib.MAX_WBITS
+    try:
+        return zlib.decompressobj(wbits).decompress(data, limit)
+    except zlib.error:
+        return None
+
+
+def describe_body(
+    capture: BodyCapture,
+    headers: Headers | None,
+) -> str | None:
+    if not capture.size:
+        return None
+
+    content_type = headers.get('Content-Type') if headers else None
+    if not is_text_content_type(content_type):
+        return f'binary content ({content_type}, {capture.size} bytes)'
+
+    data = bytes(capture.data)
+    content_encoding = (headers.get('Content-Encoding', '') if headers else '').lower()
+    if content_encoding and content_encoding != 'identity':
+        decompressed = _decompress_prefix(data, content_encoding, capture.limit)
+        if decompressed is None:
+            return f'encoded content ({content_encoding}, {capture.size} bytes)'
+        data = decompressed
+
+    if looks_like_base64(data):
+        return f'base64 content ({capture.size} bytes)'
+
+    text = data.decode(errors='replace')
+    if capture.truncated:
+        text += f'... (truncated, {capture.size} bytes)'
+    return text
@@ -0,0 +1,541 @@
+import hashlib
+from abc import ABC, abstractmethod
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+from math import ceil
+from time import time
+from typing import Any
+
+import orjson
+from httpx import AsyncByteStream, Headers, Request, Response
+from redis.asyncio import Redis
+
+from helpers.api.middleware.auth.constants import DEFAULT_TOKEN_HEADER_NAME
+from helpers.redis_client.client import RedisClient
+
+CACHEABLE_METHODS = {'GET'}
+CACHEABLE_STATUS_CODES = {200, 203, 300, 301, 308, 404, 410}
+NOT_STORED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+DEFAULT_CACHE_KEY_HEADERS = ('Authorization', DEFAULT_TOKEN_HEADER_NAME)
+
+
+class CacheStatus(StrEnum):
+    HIT = 'hit'
+    MISS = 'miss'
+    REVALIDATED = 'revalidated'
+
+
+class CacheStats:
+    def __init__(
+        self,
+    ) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def as_dict(
+        self,
+    ) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidations': self.revalidations}
+
+
+def parse_cache_control(
+    value: str | None,
+) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    if not value:
+        return directives
+    for item in value.split(','):
+        name, _, argument = item.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _parse_http_date(
+    value: str | None,
+) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_number(
+    value: str | None,
+) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def freshness_lifetime(
+    headers: Headers,
+    default_ttl: float,
+) -> float:
+    cache_control = parse_cache_control(headers.get('Cache-Control'))
+    if (max_age := _parse_number(cache_control.get('max-age'))) is not None:
+        return max_age
+    expires = _parse_http_date(headers.get('Expires'))
+    if expires is not None:
+        date = _parse_http_date(headers.get('Date')) or time()
+        return max(expires - date, 0)
+    return default_ttl
+
+
+def stored_headers(
+    headers: Headers,
+) -> list[tuple[str, str]]:
+    # Тело хранится и отдаётся уже декодированным, поэтому заголовки кодирования и длины не переносятся
+    return [(name, value) for name, value in headers.items() if name not in NOT_STORED_HEADERS]
+
+
+class ReplayAsyncByteStream(
+    AsyncByteStream,
+):
+    """Уже прочитанные куски тела, затем остаток потока исходного ответа."""
+
+    def __init__(
+        self,
+        response: Response,
+        chunks: list[bytes],
+        rest: AsyncIterator[bytes],
+    ) -> None:
+        self._response = response
+        self._chunks = chunks
+        self._rest = rest
+
+    async def __aiter__(
+        self,
+    ) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+        async for chunk in self._rest:
+            yield chunk
+
+    async def aclose(
+        self,
+    ) -> None:
+        await self._response.aclose()
+
+
+async def read_body(
+    response: Response,
+    request: Request,
+    max_size: int,
+) -> bytes | Response:
+    """Тело ответа целиком, если оно не больше max_size.
+
+    Иначе чтение останавливается на max_size, и возвращается ответ, который отдаёт прочитанное и дочитывает остальное.
+    """
+    content_length = response.headers.get('Content-Length', '')
+    if content_length.isdigit() and int(content_length) > max_size:
+        return response
+
+    chunks: list[bytes] = []
+    size = 0
+    rest = response.aiter_bytes()
+    try:
+        async for chunk in rest:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_size:
+                return Response(
+                    status_code=response.status_code,
+                    headers=stored_headers(response.headers),
+                    stream=ReplayAsyncByteStream(response, chunks, rest),
+                    request=request,
+                    extensions=response.extensions,
+                )
+    except BaseException:
+        await response.aclose()
+        raise
+    await response.aclose()
+    return b''.join(chunks)
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        status_code: int,
+        headers: list[tuple[str, str]],
+        content: bytes,
+        vary: dict[str, str | None],
+        stored_at: float,
+        freshness: float,
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.vary = vary
+        self.stored_at = stored_at
+        self.freshness = freshness
+
+    @classmethod
+    def from_response(
+        cls,
+        response: Response,
+        request: Request,
+        default_ttl: float,
+        content: bytes,
+    ) -> 'CachedResponse':
+        initial_age = _parse_number(response.headers.get('Age')) or 0
+        return cls(
+            status_code=response.status_code,
+            headers=stored_headers(response.headers),
+            content=content,
+            vary={name: request.headers.get(name) for name in _vary_headers(response.headers)},
+            stored_at=time() - initial_age,
+            freshness=freshness_lifetime(response.headers, default_ttl),
+        )
+
+    @property
+    def size(
+        self,
+    ) -> int:
+        return len(self.content) + sum(len(name) + len(value) for name, value in self.headers)
+
+    @property
+    def age(
+        self,
+    ) -> float:
+        return max(time() - self.stored_at, 0)
+
+    @property
+    def cache_control(
+        self,
+    ) -> dict[str, str | None]:
+        return parse_cache_control(Headers(self.headers).get('Cache-Control'))
+
+    @property
+    def etag(
+        self,
+    ) -> str | None:
+        return Headers(self.headers).get('ETag')
+
+    @property
+    def last_modified(
+        self,
+    ) -> str | None:
+        return Headers(self.headers).get('Last-Modified')
+
+    @property
+    def has_validators(
+        self,
+    ) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def is_fresh(
+        self,
+    ) -> bool:
+        return 'no-cache' not in self.cache_control and self.age < self.freshness
+
+    def matches(
+        self,
+        request: Request,
+    ) -> bool:
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def add_validators(
+        self,
+        request: Request,
+    ) -> None:
+        if (etag := self.etag) and 'If-None-Match' not in request.headers:
+            request.headers['If-None-Match'] = etag
+        if (last_modified := self.last_modified) and 'If-Modified-Since' not in request.headers:
+            request.headers['If-Modified-Since'] = last_modified
+
+    def revalidate(
+        self,
+        not_modified: Response,
+        default_ttl: float,
+    ) -> None:
+        updated = Headers(self.headers)
+        for name, value in not_modified.headers.items():
+            if name not in NOT_STORED_HEADERS:
+                updated[name] = value
+        self.headers = list(updated.items())
+        self.stored_at = time() - (_parse_number(not_modified.headers.get('Age')) or 0)
+        self.freshness = freshness_lifetime(updated, default_ttl)
+
+    def to_response(
+        self,
+        request: Request,
+    ) -> Response:
+        headers = Headers(self.headers)
+        headers['Age'] = str(int(self.age))
+        return Response(
+            status_code=self.status_code,
+            headers=headers,
+            content=self.content,
+            request=request,
+        )
+
+    def dumps(
+        self,
+    ) -> str:
+        return orjson.dumps(
+            {
+                'status_code': self.status_code,
+                'headers': self.headers,
+                'content': b64encode(self.content).decode(),
+                'vary': self.vary,
+                'stored_at': self.stored_at,
+                'freshness': self.freshness,
+            },
+        ).decode()
+
+    @classmethod
+    def loads(
+        cls,
+        data: str | bytes,
+    ) -> 'CachedResponse':
+        raw: dict[str, Any] = orjson.loads(data)
+        return cls(
+            status_code=raw['status_code'],
+            headers=[(name, value) for name, value in raw['headers']],
+            content=b64decode(raw['content']),
+            vary=raw['vary'],
+            stored_at=raw['stored_at'],
+            freshness=raw['freshness'],
+        )
+
+
+def _vary_headers(
+    headers: Headers,
+) -> list[str]:
+    return [name.strip().lower() for name in headers.get('Vary', '').split(',') if name.strip()]
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+
+class LRUCacheBackend(CacheBackend):
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[CachedResponse, float]] = OrderedDict()
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._entries)
+
+    async def get(
+        self,
+        key: str,
+    ) -> CachedResponse | None:
+        if (item := self._entries.get(key)) is None:
+            return None
+        entry, expires_at = item
+        if expires_at <= time():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(
+        self,
+        key: str,
+        entry: CachedResponse,
+        ttl: float,
+    ) -> None:
+        self._pop(key)
+        if entry.size > self.max_size:
+            return
+        self._entries[key] = (entry, time() + ttl)
+        self.size += entry.size
+        while len(self._entries) > self.max_entries or self.size > self.max_size:
+            self._pop(next(iter(self._entries)))
+
+    async def delete(
+        self,
+        key: str,
+    ) -> None:
+        self._pop(key)
+
+    def _pop(
+        self,
+        key: str,
+    ) -> None:
+        if (item := self._entries.pop(key, None)) is not None:
+            self.size -= item[0].size
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        key_prefix: str = 'http_cache',
+    ) -> None:
+        self._redis_client = redis_client
+        self.key_prefix = key_prefix
+
+    async def _get_redis(
+        self,
+    ) -> Redis:
+        if self._redis_client.redis is None:
+            await self._redis_client.__aenter__()
+        return self._redis_client.redis  # type: ignore
+
+    async def get(
+        self,
+        key: str,
+    ) -> CachedResponse | None:
+        redis = await self._get_redis()
+        if (data := await redis.get(f'{self.key_prefix}:{key}')) is None:
+            return None
+        return CachedResponse.loads(data)
+
+    async def set(
+        self,
+        key: str,
+        entry: CachedResponse,
+        ttl: float,
+    ) -> None:
+        redis = await self._get_redis()
+        await redis.set(f'{self.key_prefix}:{key}', entry.dumps(), ex=max(ceil(ttl), 1))
+
+    async def delete(
+        self,
+        key: str,
+    ) -> None:
+        redis = await self._get_redis()
+        await redis.delete(f'{self.key_prefix}:{key}')
+
+
+class HTTPCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        default_ttl: float = 0,
+        stale_ttl: float = 3600,
+        max_entry_size: int = 1024 * 1024,
+        key_headers: Sequence[str] = DEFAULT_CACHE_KEY_HEADERS,
+    ) -> None:
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entry_size = max_entry_size
+        self.key_headers = key_headers
+        self.stats: dict[str, CacheStats] = {}
+
+    def get_stats(
+        self,
+        destination: str,
+    ) -> CacheStats:
+        if (stats := self.stats.get(destination)) is None:
+            stats = self.stats[destination] = CacheStats()
+        return stats
+
+    def make_key(
+        self,
+        destination: str,
+        request: Request,
+    ) -> str:
+        key_headers = '\n'.join(f'{name}:{request.headers.get(name, "")}' for name in self.key_headers)
+        digest = hashlib.sha256(f'{request.method}\n{request.url}\n{key_headers}'.encode()).hexdigest()
+        return f'{destination}:{digest}'
+
+    @staticmethod
+    def is_cacheable_request(
+        request: Request,
+    ) -> bool:
+        if request.method not in CACHEABLE_METHODS:
+            return False
+        return 'no-store' not in parse_cache_control(request.headers.get('Cache-Control'))
+
+    def _storage_ttl(
+        self,
+        entry: CachedResponse,
+    ) -> float:
+        ttl = entry.freshness - entry.age
+        if entry.has_validators:
+            ttl = max(ttl, 0) + self.stale_ttl
+        return ttl
+
+    def _is_storable(
+        self,
+        response: Response,
+    ) -> bool:
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return False
+        cache_control = parse_cache_control(response.headers.get('Cache-Control'))
+        # Кеш общий для всех вызывающих, поэтому ответы для одного пользователя (private) не сохраняются
+        if 'no-store' in cache_control or 'private' in cache_control:
+            return False
+        if '*' in _vary_headers(response.headers):
+            return False
+        content_length = _parse_number(response.headers.get('Content-Length'))
+        return content_length is None or content_length <= self.max_entry_size
+
+    async def _store(
+        self,
+        key: str,
+        entry: CachedResponse,
+    ) -> None:
+        if len(entry.content) > self.max_entry_size:
+            return
+        if (ttl := self._storage_ttl(entry)) > 0:
+            await self.backend.set(key, entry, ttl)
+
+    async def handle(
+        self,
+        destination: str,
+        request: Request,
+        send: Callable[[Request], Awaitable[Response]],
+    ) -> tuple[Response, CacheStatus]:
+        stats = self.get_stats(destination)
+        key = self.make_key(destination, request)
+        entry = await self.backend.get(key)
+        if entry is not None and not entry.matches(request):
+            entry = None
+
+        request_cache_control = parse_cache_control(request.headers.get('Cache-Control'))
+        if entry is not None and entry.is_fresh() and 'no-cache' not in request_cache_control:
+            stats.hits += 1
+            return entry.to_response(request), CacheStatus.HIT
+
+        if entry is not None:
+            entry.add_validators(request)
+
+        response = await send(request)
+
+        if entry is not None and response.status_code == 304:  # noqa: PLR2004
+            await response.aread()
+            await response.aclose()
+            entry.revalidate(response, self.default_ttl)
+            await self._store(key, entry)
+            stats.revalidations += 1
+            return entry.to_response(request), CacheStatus.REVALIDATED
+
+        stats.misses += 1
+        if not self._is_storable(response):
+            return response, CacheStatus.MISS
+
+        # Ответ без Content-Length читается не дальше max_entry_size, больший отдаётся потоком без сохранения
+        content = await read_body(response, request, self.max_entry_size)
+        if isinstance(content, Response):
+            return content, CacheStatus.MISS
+        entry = CachedResponse.from_response(response, request, self.default_ttl, content)
+        await self._store(key, entry)
+        return entry.to_response(request), CacheStatus.MISS
@@ -0,0 +1,122 @@
+from collections.abc import Iterable
+from enum import StrEnum
+from time import monotonic
+
+from loguru import logger
+
+DEFAULT_FAILURE_STATUS_CODES = (502, 503, 504)
+
+
+class CircuitState(StrEnum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class _DestinationCircuit:
+    def __init__(
+        self,
+    ) -> None:
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: float | None = None
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        failure_status_codes: Iterable[int] = DEFAULT_FAILURE_STATUS_CODES,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_status_codes = set(failure_status_codes)
+        self._circuits: dict[str, _DestinationCircuit] = {}
+
+    def _get_circuit(
+        self,
+        destination: str,
+    ) -> _DestinationCircuit:
+        if (circuit := self._circuits.get(destination)) is None:
+            circuit = self._circuits[destination] = _DestinationCircuit()
+        return circuit
+
+    def get_state(
+        self,
+        destination: str,
+    ) -> CircuitState:
+        return self._get_circuit(destination).state
+
+    def allow_request(
+        self,
+        destination: str,
+    ) -> bool:
+        circuit = self._get_circuit(destination)
+        now = monotonic()
+        if circuit.state == CircuitState.OPEN:
+            if now - circuit.opened_at < self.recovery_timeout:
+                return False
+            self._transition(destination, circuit, CircuitState.HALF_OPEN)
+
+        if circuit.state == CircuitState.HALF_OPEN:
+            # Одна пробная попытка; зависшая проба не блокирует следующую дольше recovery_timeout
+            if circuit.probe_started_at is not None and now - circuit.probe_started_at < self.recovery_timeout:
+                return False
+            circuit.probe_started_at = now
+        return True
+
+    def record_success(
+        self,
+        destination: str,
+    ) -> None:
+        circuit = self._get_circuit(destination)
+        circuit.failures = 0
+        if circuit.state != CircuitState.CLOSED:
+            self._transition(destination, circuit, CircuitState.CLOSED)
+
+    def record_failure(
+        self,
+        destination: str,
+    ) -> None:
+        circuit = self._get_circuit(destination)
+        circuit.failures += 1
+        if circuit.state == CircuitState.HALF_OPEN or (
+            circuit.state == CircuitState.CLOSED and circuit.failures >= self.failure_threshold
+        ):
+            circuit.opened_at = monotonic()
+            self._transition(destination, circuit, CircuitState.OPEN)
+
+    def release_probe(
+        self,
+        destination: str,
+    ) -> None:
+        # Проба завершилась без результата (например, отменена): следующую можно пустить сразу
+        circuit = self._get_circuit(destination)
+        if circuit.state == CircuitState.HALF_OPEN:
+            circuit.probe_started_at = None
+
+    def is_failure_status(
+        self,
+        status_code: int,
+    ) -> bool:
+        return status_code in self.failure_status_codes
+
+    @staticmethod
+    def _transition(
+        destination: str,
+        circuit: _DestinationCircuit,
+        state: CircuitState,
+    ) -> None:
+        previous_state, circuit.state = circuit.state, state
+        circuit.probe_started_at = None
+        logger.info(
+            {
+                'destination': destination,
+                'event': 'circuit_breaker_state_changed',
+                'previous_state': str(previous_state),
+                'state': str(state),
+                'failures': circuit.failures,
+            },
+        )
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable, Sequence
+
+from httpx import Request, Response
+
+from helpers.clients.cache import DEFAULT_CACHE_KEY_HEADERS, read_body, stored_headers
+
+COALESCING_METHODS = {'GET', 'HEAD'}
+DEFAULT_COALESCE_KEY_HEADERS = (*DEFAULT_CACHE_KEY_HEADERS, 'Accept', 'If-None-Match', 'If-Modified-Since')
+COALESCED_EXTENSION = 'coalesced'
+DEFAULT_COALESCE_MAX_BODY_SIZE = 1024 * 1024
+
+
+class CoalescingStats:
+    def __init__(
+        self,
+    ) -> None:
+        self.requests = 0
+        self.deduplicated = 0
+
+    def as_dict(
+        self,
+    ) -> dict[str, int]:
+        return {'requests': self.requests, 'deduplicated': self.deduplicated}
+
+
+def _stored_extensions(
+    response: Response,
+) -> dict[str, object]:
+    return {name: value for name, value in response.extensions.items() if name in {'http_version', 'reason_phrase'}}
+
+
+class ResponseSnapshot:
+    def __init__(
+        self,
+        response: Response,
+        content: bytes,
+    ) -> None:
+        self.status_code = response.status_code
+        self.headers = stored_headers(response.headers)
+        self.content = content
+        self.extensions = _stored_extensions(response)
+
+    def to_response(
+        self,
+        request: Request,
+        *,
+        coalesced: bool,
+    ) -> Response:
+        return Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+            extensions={**self.extensions, COALESCED_EXTENSION: coalesced},
+        )
+
+
+async def _fetch_snapshot(
+    request: Request,
+    send: Callable[[Request], Awaitable[Response]],
+    max_body_size: int,
+) -> ResponseSnapshot | Response:
+    # Ответ больше max_body_size не буферизуется: его получает только первый вызывающий, потоком
+    response = await send(request)
+    content = await read_body(response, request, max_body_size)
+    if isinstance(content, Response):
+        return content
+    return ResponseSnapshot(response, content)
+
+
+async def _close_unclaimed(
+    task: asyncio.Task[ResponseSnapshot | Response],
+) -> None:
+    if not task.cancelled() and task.exception() is None and isinstance(response := task.result(), Response):
+        await response.aclose()
+
+
+class RequestCoalescer:
+    def __init__(
+        self,
+    ) -> None:
+        self._in_flight: dict[str, asyncio.Task[ResponseSnapshot | Response]] = {}
+        self.stats: dict[str, CoalescingStats] = {}
+
+    def get_stats(
+        self,
+        destination: str,
+    ) -> CoalescingStats:
+        if (stats := self.stats.get(destination)) is None:
+            stats = self.stats[destination] = CoalescingStats()
+        return stats
+
+    @staticmethod
+    def is_coalescable_request(
+        request: Request,
+    ) -> bool:
+        return request.method in COALESCING_METHODS
+
+    @staticmethod
+    def make_key(
+        destination: str,
+        request: Request,
+        key_headers: Sequence[str],
+    ) -> str:
+        headers = '\n'.join(f'{name}:{request.headers.get(name, "")}' for name in key_headers)
+        digest = hashlib.sha256(f'{request.method}\n{request.url}\n{headers}'.encode()).hexdigest()
+        return f'{destination}:{digest}'
+
+    async def handle(
+        self,
+        destination: str,
+        request: Request,
+        send: Callable[[Request], Awaitable[Response]],
+        key_headers: Sequence[str] = DEFAULT_COALESCE_KEY_HEADERS,
+        max_body_size: int = DEFAULT_COALESCE_MAX_BODY_SIZE,
+    ) -> Response:
+        stats = self.get_stats(destination)
+        stats.requests += 1
+        key = self.make_key(destination, request, key_headers)
+
+        if (task := self._in_flight.get(key)) is not None:
+            try:
+                result = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled() or asyncio.current_task().cancelling():  # type: ignore
+                    raise
+                # Запрос первого вызывающего отменён вместе с ним, остальные выполняют свой
+                return await send(request)
+            if isinstance(result, ResponseSnapshot):
+                stats.deduplicated += 1
+                return result.to_response(request, coalesced=True)
+            # Большой ответ отдан первому вызывающему потоком, остальные выполняют свой запрос
+            return await send(request)
+
+        # Ожидающие ждут отдельную задачу: их отмена её не прерывает, а при отмене первого вызывающего
+        # задача отменяется, и ожидающие выполняют свой запрос
+        task = asyncio.ensure_future(_fetch_snapshot(request, send, max_body_size))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done_task: self._release(key, done_task))
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Ответ отменённого вызывающего никто не прочитает: чтение прерывается, а готовый поток закрывается
+            if not task.done():
+                task.cancel()
+            else:
+                await _close_unclaimed(task)
+            raise
+        if isinstance(result, ResponseSnapshot):
+            return result.to_response(request, coalesced=False)
+        return result
+
+    def _release(
+        self,
+        key: str,
+        task: asyncio.Task[ResponseSnapshot | Response],
+    ) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Ошибку уже получили вызывающие; помечаем её прочитанной, если все они были отменены
+            task.exception()
+
+
+REQUEST_COALESCER = RequestCoalescer()
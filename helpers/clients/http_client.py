@@ -1,16 +1,50 @@
-from collections.abc import Callable
+import asyncio
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable, Sequence
 from contextlib import suppress
 from time import time
 from typing import Any, ClassVar
 
-from httpx import AsyncClient, AsyncHTTPTransport, ConnectError, HTTPStatusError, Request, Response, TimeoutException
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    ConnectError,
+    HTTPStatusError,
+    Limits,
+    Request,
+    Response,
+    TimeoutException,
+    TransportError,
+)
 from loguru import logger
 from pydantic.alias_generators import to_snake
 
 from helpers.api.middleware.trace_id.constants import DEFAULT_TRACE_ID_HEADER_NAME
+from helpers.clients.batch import BatchRequest, BatchResult
+from helpers.clients.body_capture import (
+    DEFAULT_BODY_CAPTURE_LIMIT,
+    BodyCapture,
+    CapturingAsyncByteStream,
+    describe_body,
+    is_text_content_type,
+    looks_like_base64,
+)
+from helpers.clients.cache import CacheStatus, HTTPCache
+from helpers.clients.circuit_breaker import CircuitBreaker
+from helpers.clients.coalescing import (
+    COALESCED_EXTENSION,
+    DEFAULT_COALESCE_KEY_HEADERS,
+    DEFAULT_COALESCE_MAX_BODY_SIZE,
+    REQUEST_COALESCER,
+)
+from helpers.clients.metrics import observe_request, track_transport
+from helpers.clients.pool import DEFAULT_LIMITS, TRANSPORT_REGISTRY, make_limits_key
+from helpers.clients.retry import RetryPolicy
 from helpers.contextvars import TRACE_ID
 from helpers.errors import ServerError
+from helpers.errors.api import UpstreamUnavailableError
 from helpers.json import dump_json
+from helpers.log_pipeline import emit_log_record
 
 
 async def _trace_id_header_event_hook(
@@ -37,11 +71,14 @@ def _get_request_object(
 
 def _make_input_data(
     request: Request | None,
+    request_body: BodyCapture | None = None,
 ) -> str | None:
     if not request:
         return None
     if request.url.params:
         return dump_json(dict(request.url.params))
+    if request_body is not None:
+        return describe_body(request_body, request.headers)
     return request.content.decode() if request.content else None
 
 
@@ -54,12 +91,36 @@ def _make_method(
     return f'{request.url.scheme}://{request.url.host}{port_suffix}{request.url.path}'
 
 
+async def _read_response_data(
+    response: Response,
+) -> tuple[str | None, int]:
+    if not hasattr(response, '_content'):
+        await response.aread()
+
+    response_size = len(response.content)
+    content_type = response.headers.get('Content-Type')
+    if not response_size:
+        return None, response_size
+    if not is_text_content_type(content_type):
+        return f'binary content ({content_type}, {response_size} bytes)', response_size
+    if looks_like_base64(response.content):
+        return f'base64 content ({response_size} bytes)', response_size
+
+    response_data = None
+    with suppress(RuntimeError):
+        response_data = response.text
+    return response_data, response_size
+
+
 async def _log_httpx_request(
     destination: str,
     request: Request | None,
     response: Response | None = None,
     error: Exception | None = None,
     started_at: float | None = None,
+    request_body: BodyCapture | None = None,
+    response_body: BodyCapture | None = None,
+    cache_status: CacheStatus | None = None,
 ) -> None:
     request = _get_request_object(
         request=request,
@@ -68,30 +129,34 @@ async def _log_httpx_request(
     request_headers = request.headers if request else None
     response_headers = response.headers if response else None
     response_data = None
+    response_size = None
     processing_time = None
 
     if response:
-        if not hasattr(response, '_content'):
-            await response.aread()
-
-        with suppress(RuntimeError):
-            response_data = response.text if response else None
+        if response_body is not None:
+            response_data = describe_body(response_body, response_headers)
+            response_size = response_body.size
+        else:
+            response_data, response_size = await _read_response_data(response)
 
         try:
             processing_time = response.elapsed.total_seconds()
         except RuntimeError:
             processing_time = time() - started_at if started_at else None
-
-    if isinstance(response_data, str) and response_data.endswith('='):
-        response_data = 'base64 content ...'
+    elif error is not None and started_at:
+        processing_time = time() - started_at
 
     try:
-        input_data = _make_input_data(request)
-    except (ValueError, UnicodeDecodeError):
+        input_data = _make_input_data(request, request_body)
+    except (ValueError, UnicodeDecodeError, RuntimeError):
         input_data = None
 
+    if request is not None:
+        with suppress(Exception):
+            observe_request(destination, request, response, error, processing_time)
+
     try:
-        logger.info(
+        await emit_log_record(
             {
                 'destination': destination,
                 'http_method': request.method if request else None,
@@ -100,25 +165,126 @@ async def _log_httpx_request(
                 'http_status_code': response.status_code if response else None,
                 'input_data': input_data,
                 'output_data': response_data,
+                'input_size': request_body.size if request_body is not None else None,
+                'output_size': response_size,
                 'request_headers': dict(request_headers) if request_headers else None,
                 'response_headers': dict(response_headers) if response_headers else None,
                 'error': error,
+                'cache_status': str(cache_status) if cache_status else None,
+                'coalesced': response.extensions.get(COALESCED_EXTENSION, False) if response else False,
             },
         )
     except Exception as exc:
         logger.error(exc)
 
 
+def _capture_request_body(
+    request: Request,
+    limit: int,
+) -> BodyCapture:
+    capture = BodyCapture(limit)
+    if hasattr(request, '_content'):
+        capture.feed(request.content)
+    else:
+        request.stream = CapturingAsyncByteStream(request.stream, capture)  # type: ignore
+    return capture
+
+
 class LoggingAsyncHTTPTransport(
     AsyncHTTPTransport,
 ):
     def __init__(
         self,
         destination: str,
+        body_capture_limit: int | None = DEFAULT_BODY_CAPTURE_LIMIT,
+        cache: HTTPCache | None = None,
+        coalesce: bool = False,
+        coalesce_key_headers: Sequence[str] = DEFAULT_COALESCE_KEY_HEADERS,
+        coalesce_max_body_size: int = DEFAULT_COALESCE_MAX_BODY_SIZE,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
         **kwargs: Any,
     ) -> None:
         self._destination = destination
+        self._body_capture_limit = body_capture_limit
+        self._cache = cache
+        self._coalesce = coalesce
+        self._coalesce_key_headers = coalesce_key_headers
+        self._coalesce_max_body_size = coalesce_max_body_size
+        self._retry = retry
+        self._circuit_breaker = circuit_breaker
         super().__init__(**kwargs)
+        track_transport(self, destination)
+
+    async def _send_once(
+        self,
+        request: Request,
+    ) -> Response:
+        if self._circuit_breaker is None:
+            return await super().handle_async_request(request)
+        if not self._circuit_breaker.allow_request(self._destination):
+            raise UpstreamUnavailableError(debug=f'Запросы к {self._destination} приостановлены: цепь разомкнута')
+        try:
+            response = await super().handle_async_request(request)
+        except TransportError:
+            self._circuit_breaker.record_failure(self._destination)
+            raise
+        except BaseException:
+            self._circuit_breaker.release_probe(self._destination)
+            raise
+        if self._circuit_breaker.is_failure_status(response.status_code):
+            self._circuit_breaker.record_failure(self._destination)
+        else:
+            self._circuit_breaker.record_success(self._destination)
+        return response
+
+    async def _send_with_retries(
+        self,
+        request: Request,
+    ) -> Response:
+        if self._retry is None or not self._retry.is_retryable_request(request):
+            return await self._send_once(request)
+        for attempt in range(self._retry.retries):
+            try:
+                response = await self._send_once(request)
+            except (ConnectError, TimeoutException) as exc:
+                logger.warning(f'Повтор запроса к {self._destination} ({attempt + 1}/{self._retry.retries}): {exc!r}')
+            else:
+                if response.status_code not in self._retry.status_codes:
+                    return response
+                await response.aclose()
+                logger.warning(
+                    f'Повтор запроса к {self._destination} ({attempt + 1}/{self._retry.retries}): '
+                    f'статус {response.status_code}',
+                )
+            await asyncio.sleep(self._retry.get_delay(attempt))
+        return await self._send_once(request)
+
+    async def _send_network(
+        self,
+        request: Request,
+    ) -> Response:
+        if not self._coalesce or not REQUEST_COALESCER.is_coalescable_request(request):
+            return await self._send_with_retries(request)
+        return await REQUEST_COALESCER.handle(
+            destination=self._destination,
+            request=request,
+            send=self._send_with_retries,
+            key_headers=self._coalesce_key_headers,
+            max_body_size=self._coalesce_max_body_size,
+        )
+
+    async def _send(
+        self,
+        request: Request,
+    ) -> tuple[Response, CacheStatus | None]:
+        if self._cache is None or not self._cache.is_cacheable_request(request):
+            return await self._send_network(request), None
+        return await self._cache.handle(
+            destination=self._destination,
+            request=request,
+            send=self._send_network,
+        )
 
     async def handle_async_request(
         self,
@@ -126,9 +292,13 @@ class LoggingAsyncHTTPTransport(
     ) -> Response:
         error: Exception | None = None
         response: Response | None = None
+        cache_status: CacheStatus | None = None
         started_at = time()
+        request_body = (
+            _capture_request_body(request, self._body_capture_limit) if self._body_capture_limit is not None else None
+        )
         try:
-            response = await super().handle_async_request(request)
+            response, cache_status = await self._send(request)
         except HTTPStatusError as exc:
             response = exc.response
             error = exc
@@ -145,13 +315,41 @@ class LoggingAsyncHTTPTransport(
             error = exc
             raise
         finally:
-            await _log_httpx_request(
-                destination=self._destination,
-                request=request,
-                response=response,
-                error=error,
-                started_at=started_at,
-            )
+            if error is not None or request_body is None:
+                await _log_httpx_request(
+                    destination=self._destination,
+                    request=request,
+                    response=response,
+                    error=error,
+                    started_at=started_at,
+                    request_body=request_body,
+                    cache_status=cache_status,
+                )
+
+        if request_body is not None:
+            # Тело ответа логируется при закрытии потока, когда клиент дочитал его до конца
+            async def _log_on_close(response_body: BodyCapture) -> None:
+                await _log_httpx_request(
+                    destination=self._destination,
+                    request=request,
+                    response=response,
+                    started_at=started_at,
+                    request_body=request_body,
+                    response_body=response_body,
+                    cache_status=cache_status,
+                )
+
+            response_body = BodyCapture(self._body_capture_limit)  # type: ignore
+            if hasattr(response, '_content'):
+                # Ответ уже в памяти (например, из кэша) и его поток не будет закрыт клиентом
+                response_body.feed(response.content)
+                await _log_on_close(response_body)
+            else:
+                response.stream = CapturingAsyncByteStream(  # type: ignore
+                    response.stream,  # type: ignore
+                    response_body,
+                    on_close=_log_on_close,
+                )
         return response
 
 
@@ -165,6 +363,18 @@ class BaseApiClient(AsyncClient):
         ],
     }
     _logging: bool = True
+    _limits: ClassVar[Limits] = DEFAULT_LIMITS
+    _http2: bool = False
+    _shared_transport: bool = False
+    # В лог попадают первые N байт тела, поток не буферизуется; None - ответ читается в память и логируется целиком
+    _log_body_limit: int | None = DEFAULT_BODY_CAPTURE_LIMIT
+    _cache: ClassVar[HTTPCache | None] = None
+    _coalesce_requests: bool = False
+    _coalesce_key_headers: ClassVar[Sequence[str]] = DEFAULT_COALESCE_KEY_HEADERS
+    _coalesce_max_body_size: int = DEFAULT_COALESCE_MAX_BODY_SIZE
+    _retry: ClassVar[RetryPolicy | None] = None
+    _circuit_breaker: ClassVar[CircuitBreaker | None] = None
+    _batch_concurrency: int = 10
 
     def __init__(self) -> None:
         self._destination = to_snake(self.__class__.__name__.replace('Client', ''))
@@ -172,12 +382,102 @@ class BaseApiClient(AsyncClient):
             base_url=self._base_url,
             headers=self._headers,
             timeout=self._timeout,
-            transport=(
-                LoggingAsyncHTTPTransport(
-                    destination=self._destination,
-                )
-                if self._logging
-                else None
-            ),
+            transport=self._get_transport(),
         )
         self.event_hooks.update(self._default_event_hooks)
+
+    def _make_transport(self) -> AsyncBaseTransport:
+        if self._logging:
+            return LoggingAsyncHTTPTransport(
+                destination=self._destination,
+                body_capture_limit=self._log_body_limit,
+                cache=self._cache,
+                coalesce=self._coalesce_requests,
+                coalesce_key_headers=self._coalesce_key_headers,
+                coalesce_max_body_size=self._coalesce_max_body_size,
+                retry=self._retry,
+                circuit_breaker=self._circuit_breaker,
+                limits=self._limits,
+                http2=self._http2,
+            )
+        return AsyncHTTPTransport(
+            limits=self._limits,
+            http2=self._http2,
+        )
+
+    def _get_transport(self) -> AsyncBaseTransport:
+        if not self._shared_transport:
+            return self._make_transport()
+        return TRANSPORT_REGISTRY.get_or_create(
+            destination=self._destination,
+            factory=self._make_transport,
+            settings=self._transport_settings(),
+        )
+
+    def _transport_settings(self) -> Hashable:
+        # Клиенты с одинаковым именем, но разными настройками не должны делить пул соединений
+        return (
+            self._base_url,
+            make_limits_key(self._limits),
+            self._http2,
+            self._logging,
+            self._log_body_limit,
+            id(self._cache),
+            self._coalesce_requests,
+            tuple(self._coalesce_key_headers),
+            self._coalesce_max_body_size,
+            id(self._retry),
+            id(self._circuit_breaker),
+        )
+
+    async def _send_batch_request(
+        self,
+        batch_request: BatchRequest,
+    ) -> BatchResult:
+        try:
+            response = await self.request(batch_request.method, batch_request.url, **batch_request.kwargs)
+        except Exception as exc:
+            return BatchResult(batch_request, error=exc)
+        return BatchResult(batch_request, response=response)
+
+    async def batch(
+        self,
+        requests: Iterable[BatchRequest],
+        concurrency: int | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        # Задачи создаются в контексте вызывающего, поэтому TRACE_ID попадает в каждый запрос
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        pending_requests = iter(requests)
+        in_flight: dict[asyncio.Task[BatchResult], BatchRequest] = {}
+        concurrency = concurrency or self._batch_concurrency
+
+        try:
+            while True:
+                while len(in_flight) < concurrency and (batch_request := next(pending_requests, None)) is not None:
+                    in_flight[asyncio.create_task(self._send_batch_request(batch_request))] = batch_request
+                if not in_flight:
+                    return
+
+                remaining = deadline - loop.time() if deadline is not None else None
+                done, _ = await asyncio.wait(
+                    in_flight,
+                    timeout=max(remaining, 0) if remaining is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for task in done:
+                    del in_flight[task]
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+        for batch_request in [*in_flight.values(), *pending_requests]:
+            yield BatchResult(
+                batch_request,
+                error=ServerError(debug=f'Превышено время выполнения пакета запросов к {self._destination}'),
+            )
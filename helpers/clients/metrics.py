@@ -0,0 +1,93 @@
+import re
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+from httpx import AsyncHTTPTransport, Request, Response
+
+from helpers.metrics import Counter, Gauge, Histogram, MetricSamples
+
+PATH_TEMPLATE_EXTENSION = 'path_template'
+_ID_SEGMENT_PATTERN = re.compile(
+    r'\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24,}',
+)
+
+_TRACKED_TRANSPORTS: WeakKeyDictionary[AsyncHTTPTransport, str] = WeakKeyDictionary()
+
+
+def track_transport(
+    transport: AsyncHTTPTransport,
+    destination: str,
+) -> None:
+    _TRACKED_TRANSPORTS[transport] = destination
+
+
+def _collect_pool_connections() -> MetricSamples:
+    samples: dict[tuple[str, str], float] = {}
+    for transport, destination in list(_TRACKED_TRANSPORTS.items()):
+        for connection in getattr(transport._pool, 'connections', ()):  # noqa: SLF001
+            state = 'idle' if connection.is_idle() else 'in_use'
+            samples[(destination, state)] = samples.get((destination, state), 0) + 1
+    return samples.items()
+
+
+def _collect_pool_waiting_requests() -> MetricSamples:
+    samples: dict[tuple[str, ...], float] = {}
+    for transport, destination in list(_TRACKED_TRANSPORTS.items()):
+        pool_requests = getattr(transport._pool, '_requests', ())  # noqa: SLF001
+        waiting = sum(1 for pool_request in pool_requests if pool_request.is_queued())
+        samples[(destination,)] = samples.get((destination,), 0) + waiting
+    return samples.items()
+
+
+HTTP_CLIENT_REQUEST_DURATION = Histogram(
+    'http_client_request_duration_seconds',
+    'Outbound HTTP request latency',
+    ('destination', 'http_method', 'path', 'status_code'),
+)
+HTTP_CLIENT_ERRORS = Counter(
+    'http_client_errors_total',
+    'Outbound HTTP requests failed with an exception',
+    ('destination', 'http_method', 'path', 'exception'),
+)
+HTTP_CLIENT_POOL_CONNECTIONS = Gauge(
+    'http_client_pool_connections',
+    'Connections in the HTTP client pools',
+    ('destination', 'state'),
+    collect=_collect_pool_connections,
+)
+HTTP_CLIENT_POOL_WAITING_REQUESTS = Gauge(
+    'http_client_pool_waiting_requests',
+    'Requests waiting for a free connection in the HTTP client pools',
+    ('destination',),
+    collect=_collect_pool_waiting_requests,
+)
+
+
+@lru_cache(maxsize=4096)
+def _make_path_template(
+    path: str,
+) -> str:
+    return '/'.join('{id}' if _ID_SEGMENT_PATTERN.fullmatch(segment) else segment for segment in path.split('/'))
+
+
+def get_path_template(
+    request: Request,
+) -> str:
+    if template := request.extensions.get(PATH_TEMPLATE_EXTENSION):
+        return template
+    return _make_path_template(request.url.path)
+
+
+def observe_request(
+    destination: str,
+    request: Request,
+    response: Response | None,
+    error: Exception | None,
+    processing_time: float | None,
+) -> None:
+    path = get_path_template(request)
+    if error is not None:
+        HTTP_CLIENT_ERRORS.inc((destination, request.method, path, error.__class__.__name__))
+    if processing_time is not None:
+        status_code = str(response.status_code) if response is not None else 'error'
+        HTTP_CLIENT_REQUEST_DURATION.observe(processing_time, (destination, request.method, path, status_code))
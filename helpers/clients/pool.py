@@ -0,0 +1,98 @@
+from collections.abc import AsyncGenerator, Callable, Hashable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from httpx import AsyncBaseTransport, Limits, Request, Response, TransportError
+from loguru import logger
+
+DEFAULT_LIMITS = Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0)
+
+
+class SharedTransport(
+    AsyncBaseTransport,
+):
+    """Не владеющая ссылка на транспорт из реестра: закрытие клиента не закрывает пул соединений."""
+
+    def __init__(
+        self,
+        transport: AsyncBaseTransport,
+    ) -> None:
+        self.transport = transport
+
+    async def handle_async_request(
+        self,
+        request: Request,
+    ) -> Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(
+        self,
+    ) -> None:
+        return None
+
+
+def make_limits_key(
+    limits: Limits,
+) -> tuple[int | None, int | None, float | None]:
+    return limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry
+
+
+class TransportRegistry:
+    """Общие пулы соединений: клиенты делят транспорт, только если совпадают назначение и настройки."""
+
+    def __init__(
+        self,
+    ) -> None:
+        self._transports: dict[tuple[str, Hashable], AsyncBaseTransport] = {}
+
+    @property
+    def destinations(
+        self,
+    ) -> list[str]:
+        return list(dict.fromkeys(destination for destination, _ in self._transports))
+
+    def get(
+        self,
+        destination: str,
+        settings: Hashable = (),
+    ) -> AsyncBaseTransport | None:
+        return self._transports.get((destination, settings))
+
+    def get_or_create(
+        self,
+        destination: str,
+        factory: Callable[[], AsyncBaseTransport],
+        settings: Hashable = (),
+    ) -> SharedTransport:
+        key = (destination, settings)
+        if (transport := self._transports.get(key)) is None:
+            transport = self._transports[key] = factory()
+        return SharedTransport(transport)
+
+    async def aclose(
+        self,
+    ) -> None:
+        transports, self._transports = self._transports, {}
+        for (destination, _), transport in transports.items():
+            try:
+                await transport.aclose()
+            # Сокет, который уже закрыт сервером, или event loop, который уже остановлен
+            except (TransportError, OSError, RuntimeError) as exc:
+                logger.error(f'Не удалось закрыть пул соединений {destination}: {exc}')
+
+
+TRANSPORT_REGISTRY = TransportRegistry()
+
+
+async def close_shared_transports() -> None:
+    await TRANSPORT_REGISTRY.aclose()
+
+
+@asynccontextmanager
+async def shared_transports_lifespan(
+    _app: Any,
+) -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        await close_shared_transports()
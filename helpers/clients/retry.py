@@ -0,0 +1,37 @@
+import random
+from collections.abc import Iterable
+
+from httpx import Request
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE')
+DEFAULT_RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        retries: int = 2,
+        backoff: float = 0.1,
+        backoff_max: float = 2.0,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+        status_codes: Iterable[int] = DEFAULT_RETRY_STATUS_CODES,
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.methods = {method.upper() for method in methods}
+        self.status_codes = set(status_codes)
+
+    def is_retryable_request(
+        self,
+        request: Request,
+    ) -> bool:
+        # Потоковое тело нельзя отправить повторно
+        return request.method in self.methods and hasattr(request, '_content')
+
+    def get_delay(
+        self,
+        attempt: int,
+    ) -> float:
+        # Экспоненциальная задержка с полным джиттером
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))  # noqa: S311
@@ -2,5 +2,7 @@ from contextvars import ContextVar
 
 from helpers.models.user import UserContext
 
-TRACE_ID: ContextVar[str] = ContextVar('TRACE_ID', default='default_trace_id')
+DEFAULT_TRACE_ID = 'default_trace_id'
+
+TRACE_ID: ContextVar[str] = ContextVar('TRACE_ID', default=DEFAULT_TRACE_ID)
 USER_CTX: ContextVar[UserContext | None] = ContextVar('USER_CTX', default=None)
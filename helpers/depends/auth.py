@@ -4,27 +4,41 @@ from fastapi import Depends
 from pydantic import ValidationError
 from starlette.requests import Request
 
+from helpers.api.middleware.auth.constants import AUTH_USER_SCOPE_KEY
+from helpers.api.middleware.auth.middleware import get_auth_token_payload
 from helpers.contextvars import USER_CTX
 from helpers.errors.auth import AccessForbiddenError, InvalidTokenError
 from helpers.models.user import UserContext, UserStatus
 
 
-async def get_current_user(request: Request) -> UserContext:
-    payload = request.scope.get('auth_token_payload')
+def _get_user_context(request: Request) -> UserContext | None:
+    if (user_model := request.scope.get(AUTH_USER_SCOPE_KEY)) is not None:
+        USER_CTX.set(user_model)
+        return user_model
+
+    payload = get_auth_token_payload(request.scope)
 
     if not payload:
-        raise InvalidTokenError
+        return None
 
     try:
         user_model = UserContext.model_validate(payload)
     except ValidationError as err:
         raise InvalidTokenError from err
 
+    request.scope[AUTH_USER_SCOPE_KEY] = user_model
     USER_CTX.set(user_model)
 
     return user_model
 
 
+async def get_current_user(request: Request) -> UserContext:
+    if (user_model := _get_user_context(request)) is None:
+        raise InvalidTokenError
+
+    return user_model
+
+
 async def get_active_user(user: Annotated[UserContext, Depends(get_current_user)]) -> UserContext | None:
     if user.status not in [UserStatus.VERIFIED, UserStatus.NOT_VERIFIED, UserStatus.SUSPECTED]:
         raise AccessForbiddenError
@@ -32,16 +46,4 @@ async def get_active_user(user: Annotated[UserContext, Depends(get_current_user)
     return user
 
 async def get_optional_user(request: Request) -> UserContext | None:
-    payload = request.scope.get('auth_token_payload')
-
-    if not payload:
-        return None
-
-    try:
-        user_model = UserContext.model_validate(payload)
-    except ValidationError as err:
-        raise InvalidTokenError from err
-
-    USER_CTX.set(user_model)
-
-    return user_model
\ No newline at end of file
+    return _get_user_context(request)
\ No newline at end of file
@@ -28,6 +28,35 @@ async def get_db_session(
     finally:
         await db_client.close_ctx_session()
 
+
+async def get_lazy_db_session(
+    db_client: Annotated[SQLAlchemyClient, Depends(get_db_client)],
+) -> AsyncGenerator[AsyncSession, None]:
+    # Отдельная сессия на запрос без привязки к TRACE_ID. Соединение берётся на первом запросе к БД
+    # и возвращается в пул сразу после чтений и после commit или rollback, а не при выходе из зависимости
+    session = db_client.new_session()
+
+    try:
+        yield session
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def get_read_db_session(
+    db_client: Annotated[SQLAlchemyClient, Depends(get_db_client)],
+) -> AsyncGenerator[AsyncSession, None]:
+    session = db_client.get_session(read_only=True)
+
+    try:
+        yield session
+    finally:
+        await db_client.close_ctx_session()
+
+
 @asynccontextmanager
 async def get_db_session_context(
     db_client: Annotated[SQLAlchemyClient, Depends(get_db_client)],
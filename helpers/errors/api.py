@@ -29,3 +29,15 @@ class NotFoundError(ServerError):
     status_code = 404
     message = 'Pecypc не найден'
     capture_by_sentry = False
+
+
+class UpstreamUnavailableError(ServerError):
+    status_code = 503
+    message = 'Сервис временно недоступен'
+    capture_by_sentry = False
+
+
+class InvalidCursorError(ServerError):
+    status_code = 400
+    message = 'Некорректный курсор пагинации'
+    capture_by_sentry = False
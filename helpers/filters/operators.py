@@ -1,12 +1,16 @@
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FilterOperator(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     eq: Any = None
     ne: Any = None
     gt: Any = None
     lt: Any = None
     gte: Any = None
-    lte: Any = None
\ No newline at end of file
+    lte: Any = None
+    in_: list[Any] | None = Field(default=None, alias='in')
+    between: tuple[Any, Any] | None = None
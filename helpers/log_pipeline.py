@@ -0,0 +1,200 @@
+import asyncio
+import sys
+from collections.abc import AsyncGenerator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import Context, copy_context
+from enum import StrEnum
+from os.path import basename, splitext
+from typing import Any
+
+from loguru import logger
+
+from helpers.metrics import Counter, Gauge, MetricSamples
+
+LogRecord = dict[str, Any] | Callable[[], dict[str, Any]]
+# Запись, контекст и место вызова на момент постановки в очередь: в потоке записи их уже нет
+QueuedLogRecord = tuple[LogRecord, Context, tuple[str, str, int, str]]
+
+
+class OverflowPolicy(StrEnum):
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEW = 'drop_new'
+    BLOCK = 'block'
+
+
+LOG_PIPELINE_DROPPED_RECORDS = Counter(
+    'log_pipeline_dropped_records_total',
+    'Log records dropped because the log pipeline queue was full',
+    ('policy',),
+)
+
+
+class AsyncLogPipeline:
+    """Фоновая запись структурированных логов: в обработчике запроса остаётся только постановка в очередь.
+
+    Записи форматируются и пишутся пачками в отдельном потоке, вне event loop.
+    Записью может быть словарь или функция без аргументов, которая его возвращает.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        encoder: Callable[[dict[str, Any]], str] | None = None,
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.overflow_policy = overflow_policy
+        self.encoder = encoder
+        self.dropped = 0
+        self._queue: asyncio.Queue[QueuedLogRecord] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def is_running(
+        self,
+    ) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def queue_size(
+        self,
+    ) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(
+        self,
+    ) -> None:
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-pipeline')
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(
+        self,
+    ) -> None:
+        if self._worker is None or self._queue is None:
+            return
+        if not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._worker = self._executor = self._queue = None
+
+    def _drop(
+        self,
+    ) -> None:
+        self.dropped += 1
+        LOG_PIPELINE_DROPPED_RECORDS.inc((str(self.overflow_policy),))
+
+    async def put(
+        self,
+        record: LogRecord,
+        depth: int = 0,
+    ) -> None:
+        queue = self._queue
+        if queue is None:
+            raise RuntimeError('Log pipeline is not started')
+        frame = sys._getframe(depth + 1)  # noqa: SLF001
+        item = (
+            record,
+            copy_context(),
+            (frame.f_globals.get('__name__', ''), frame.f_code.co_name, frame.f_lineno, frame.f_code.co_filename),
+        )
+        if self.overflow_policy == OverflowPolicy.BLOCK:
+            await queue.put(item)
+            return
+        if queue.full():
+            if self.overflow_policy == OverflowPolicy.DROP_NEW:
+                self._drop()
+                return
+            queue.get_nowait()
+            queue.task_done()
+            self._drop()
+        queue.put_nowait(item)
+
+    async def _run(
+        self,
+    ) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while queue is not None:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await loop.run_in_executor(self._executor, self._write_batch, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _write_batch(
+        self,
+        batch: list[QueuedLogRecord],
+    ) -> None:
+        for record, context, caller in batch:
+            try:
+                context.run(self._write, record, caller)
+            except Exception as exc:
+                logger.error(exc)
+
+    def _write(
+        self,
+        record: LogRecord,
+        caller: tuple[str, str, int, str],
+    ) -> None:
+        name, function, line, path = caller
+
+        def _patch_caller(log_record: Any) -> None:
+            log_record.update(
+                name=name,
+                function=function,
+                line=line,
+                module=splitext(basename(path))[0],
+                file=type(log_record['file'])(basename(path), path),
+            )
+
+        data = record() if callable(record) else record
+        logger.patch(_patch_caller).info(self.encoder(data) if self.encoder else data)
+
+
+LOG_PIPELINE = AsyncLogPipeline()
+
+
+def _collect_queue_size() -> MetricSamples:
+    return [((), LOG_PIPELINE.queue_size)]
+
+
+LOG_PIPELINE_QUEUE_SIZE = Gauge(
+    'log_pipeline_queue_size',
+    'Log records waiting in the log pipeline queue',
+    collect=_collect_queue_size,
+)
+
+
+async def emit_log_record(
+    record: LogRecord,
+) -> None:
+    if LOG_PIPELINE.is_running:
+        await LOG_PIPELINE.put(record, depth=1)
+    elif callable(record):
+        logger.opt(lazy=True, depth=1).info('{}', record)
+    else:
+        logger.opt(depth=1).info(record)
+
+
+@asynccontextmanager
+async def log_pipeline_lifespan(
+    _app: Any,
+) -> AsyncGenerator[None, None]:
+    await LOG_PIPELINE.start()
+    try:
+        yield
+    finally:
+        await LOG_PIPELINE.stop()
@@ -0,0 +1,242 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LabelValues = tuple[str, ...]
+MetricSamples = Iterable[tuple[LabelValues, float]]
+
+
+def _escape_label_value(
+    value: str,
+) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(
+    label_names: Sequence[str],
+    label_values: LabelValues,
+    extra: str = '',
+) -> str:
+    labels = [f'{name}="{_escape_label_value(str(value))}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def _format_value(
+    value: float,
+) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+    ) -> None:
+        self._metrics: dict[str, 'Metric'] = {}
+
+    def register(
+        self,
+        metric: 'Metric',
+    ) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+
+    def get(
+        self,
+        name: str,
+    ) -> 'Metric | None':
+        return self._metrics.get(name)
+
+    def render(
+        self,
+    ) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+METRICS_REGISTRY = MetricsRegistry()
+
+
+class Metric(ABC):
+    type_name: str
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        registry: MetricsRegistry | None = METRICS_REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        if registry is not None:
+            registry.register(self)
+
+    def render(
+        self,
+    ) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(
+        self,
+    ) -> list[str]: ...
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        registry: MetricsRegistry | None = METRICS_REGISTRY,
+    ) -> None:
+        super().__init__(name, documentation, label_names, registry)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(
+        self,
+        label_values: LabelValues = (),
+        amount: float = 1,
+    ) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(
+        self,
+        label_values: LabelValues = (),
+    ) -> float:
+        return self._values.get(label_values, 0)
+
+    def _render_samples(
+        self,
+    ) -> list[str]:
+        return [
+            f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Значение задаётся через set() либо вычисляется функцией collect в момент выгрузки."""
+
+    type_name = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        collect: Callable[[], MetricSamples] | None = None,
+        registry: MetricsRegistry | None = METRICS_REGISTRY,
+    ) -> None:
+        super().__init__(name, documentation, label_names, registry)
+        self._values: dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(
+        self,
+        value: float,
+        label_values: LabelValues = (),
+    ) -> None:
+        self._values[label_values] = value
+
+    def inc(
+        self,
+        label_values: LabelValues = (),
+        amount: float = 1,
+    ) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(
+        self,
+        label_values: LabelValues = (),
+        amount: float = 1,
+    ) -> None:
+        self.inc(label_values, -amount)
+
+    def get(
+        self,
+        label_values: LabelValues = (),
+    ) -> float:
+        return self._values.get(label_values, 0)
+
+    def _render_samples(
+        self,
+    ) -> list[str]:
+        samples = self._collect() if self._collect else self._values.items()
+        return [
+            f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}' for labels, value in samples
+        ]
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        registry: MetricsRegistry | None = METRICS_REGISTRY,
+    ) -> None:
+        super().__init__(name, documentation, label_names, registry)
+        self.buckets = tuple(sorted(buckets))
+        # На каждый набор меток: счётчики по корзинам (последняя - +Inf), сумма и количество
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(
+        self,
+        value: float,
+        label_values: LabelValues = (),
+    ) -> None:
+        if (series := self._values.get(label_values)) is None:
+            series = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        bucket_counts, totals = series
+        bucket_counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def get_count(
+        self,
+        label_values: LabelValues = (),
+    ) -> int:
+        series = self._values.get(label_values)
+        return int(series[1][1]) if series else 0
+
+    def _render_samples(
+        self,
+    ) -> list[str]:
+        lines = []
+        for labels, (bucket_counts, (total_sum, total_count)) in self._values.items():
+            cumulative = 0
+            for upper_bound, bucket_count in zip((*self.buckets, float('inf')), bucket_counts):
+                cumulative += bucket_count
+                le_label = f'le="{_format_value(upper_bound)}"'
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(self.label_names, labels, le_label)} {cumulative}',
+                )
+            formatted_labels = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{formatted_labels} {_format_value(total_sum)}')
+            lines.append(f'{self.name}_count{formatted_labels} {_format_value(total_count)}')
+        return lines
+
+
+def render_prometheus(
+    registry: MetricsRegistry = METRICS_REGISTRY,
+) -> str:
+    return registry.render()
@@ -10,3 +10,9 @@ class PaginatedResponse(BaseModel):
     total_pages: int
     data: list[Any]
 
+
+class CursorPaginatedResponse(BaseModel):
+    size: int
+    next_cursor: str | None
+    prev_cursor: str | None
+    data: list[Any]
@@ -1,39 +1,134 @@
 from abc import ABC
-from typing import Any
+from collections.abc import AsyncGenerator, Iterable, Sequence
+from typing import Any, ClassVar
 from uuid import UUID
 
-from sqlalchemy import select, update
+from pydantic import BaseModel
+from sqlalchemy import Select, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from helpers.sqlalchemy.base_model import Base
+from helpers.sqlalchemy.bulk import (
+    DEFAULT_BULK_CHUNK_SIZE,
+    bulk_insert,
+    bulk_update_rows,
+    update_by_ids,
+)
+from helpers.sqlalchemy.entity_cache import EntityCache
+from helpers.sqlalchemy.filters import compile_filter
+from helpers.sqlalchemy.loader import forget_loaded, get_batch_loader
+from helpers.sqlalchemy.pagination import KeysetPage, apply_keyset, make_keyset_page
+from helpers.sqlalchemy.replicas import USE_REPLICA_OPTION
 
 
 class ISqlAlchemyRepository[Model: Base](ABC):
     _model: type[Model]
+    # Чтения репозитория можно отправлять в реплики, если допустимо их отставание от primary
+    _read_from_replicas: ClassVar[bool] = False
+    # Кеш get и get_list(ids=...) для часто читаемых сущностей, сбрасывается после commit изменений
+    _entity_cache: ClassVar[EntityCache | None] = None
+    # get(id), вызванные конкурентно в одной сессии, выполняются одним запросом и запоминаются до конца транзакции
+    _batch_get: ClassVar[bool] = False
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+    def _for_read(self, query: Select[Any]) -> Select[Any]:
+        return query.execution_options(**{USE_REPLICA_OPTION: True}) if self._read_from_replicas else query
+
+    def _forget_loaded(self, ids: Iterable[UUID | int]) -> None:
+        forget_loaded(self.session, self._model, ids)
+
+    def _invalidate_cache(self, ids: Iterable[UUID | int]) -> None:
+        ids = list(ids)
+        self._forget_loaded(ids)
+        if self._entity_cache is not None:
+            self._entity_cache.invalidate_on_commit(self.session, self._model, ids)
+
     async def create(self, db_object: Model) -> UUID | int:
         self.session.add(db_object)
         await self.session.flush()
+        self._forget_loaded((db_object.id,))
         return db_object.id
 
     async def create_many(self, db_objects: list[Model]) -> list[UUID | int]:
         self.session.add_all(db_objects)
         await self.session.flush()
-        return [db_object.id for db_object in db_objects]
+        ids = [db_object.id for db_object in db_objects]
+        self._forget_loaded(ids)
+        return ids
+
+    async def bulk_create(
+        self,
+        values: Sequence[dict[str, Any]],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+        *,
+        return_objects: bool = False,
+    ) -> list[Any]:
+        result = await bulk_insert(
+            self.session, self._model, values, chunk_size=chunk_size, return_objects=return_objects
+        )
+        self._forget_loaded([row.id for row in result] if return_objects else result)
+        return result
+
+    async def bulk_upsert(
+        self,
+        values: Sequence[dict[str, Any]],
+        conflict_columns: Sequence[str],
+        update_columns: Sequence[str] | None = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+        *,
+        return_objects: bool = False,
+    ) -> list[Any]:
+        result = await bulk_insert(
+            self.session,
+            self._model,
+            values,
+            chunk_size=chunk_size,
+            conflict_columns=conflict_columns,
+            update_columns=update_columns,
+            return_objects=return_objects,
+        )
+        self._invalidate_cache([row.id for row in result] if return_objects else result)
+        return result
 
     async def get_one_by(self, **kwargs: Any) -> Model | None:
         query = select(self._model).filter_by(**kwargs).limit(1)
-        result = await self.session.scalar(query)
+        result = await self.session.scalar(self._for_read(query))
         return result
 
     async def get(self, obj_id: UUID | int) -> Model | None:
+        if self._batch_get:
+            return await get_batch_loader(self.session, self._model, type(self), self._get_many).load(obj_id)
+        if self._entity_cache is not None:
+            db_objects = await self._get_many([obj_id])
+            return db_objects[0] if db_objects else None
+        return await self._load(obj_id)
+
+    async def _load(self, obj_id: UUID | int) -> Model | None:
+        if self._read_from_replicas:
+            return await self.session.scalar(self._for_read(select(self._model).where(self._model.id == obj_id)))
         db_object = await self.session.get(self._model, obj_id)
         return db_object
 
     async def get_list(self, ids: list[UUID | int] | None = None, **filters: Any) -> list[Model]:
+        if ids and not filters and self._entity_cache is not None:
+            return await self._get_many(ids)
+        return await self._load_list(ids, **filters)
+
+    async def _get_many(self, ids: list[UUID | int]) -> list[Model]:
+        if self._entity_cache is not None:
+            return await self._entity_cache.get_many(self.session, self._model, ids, self._load_for_cache)
+        return await self._load_list(ids)
+
+    async def _load_for_cache(self, ids: list[UUID | int]) -> list[Model]:
+        # Кеш заполняется только из primary: отстающая реплика вернёт строку старше версии в Redis
+        query = select(self._model).where(self._model.id.in_(ids)).execution_options(**{USE_REPLICA_OPTION: False})
+        db_objects = await self.session.scalars(query)
+        return list(db_objects.all())
+
+    async def _load_list(self, ids: list[UUID | int] | None = None, **filters: Any) -> list[Model]:
         query = select(self._model)
 
         if ids:
@@ -42,22 +137,94 @@ class ISqlAlchemyRepository[Model: Base](ABC):
         if filters:
             query = query.filter_by(**filters)
 
-        db_objects = await self.session.scalars(query)
+        db_objects = await self.session.scalars(self._for_read(query))
+        return list(db_objects.all())
+
+    async def get_filtered_list(self, filter_model: BaseModel) -> list[Model]:
+        # Поля filter_model - FilterOperator или значения для сравнения на равенство, имена совпадают с колонками
+        query, params = compile_filter(self._model, filter_model)
+        db_objects = await self.session.scalars(self._for_read(query), params)
         return list(db_objects.all())
 
+    async def get_page_by_cursor(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        order_by: Sequence[InstrumentedAttribute[Any]] | None = None,
+        *,
+        descending: bool = False,
+        **filters: Any,
+    ) -> KeysetPage:
+        # Колонки сортировки должны однозначно задавать порядок строк и быть покрыты индексом
+        columns = order_by or (self._model.created_at, self._model.id)
+        query = select(self._model)
+
+        if filters:
+            query = query.filter_by(**filters)
+
+        query, direction = apply_keyset(query, columns, cursor, limit, descending=descending)
+        db_objects = await self.session.scalars(self._for_read(query))
+        return make_keyset_page(list(db_objects.all()), columns, limit, direction)
+
+    async def stream(
+        self,
+        chunk_size: int = 1000,
+        columns: Sequence[InstrumentedAttribute[Any]] | None = None,
+        **filters: Any,
+    ) -> AsyncGenerator[list[Any], None]:
+        # Строки читаются серверным курсором по chunk_size, с columns вместо моделей отдаются Row
+        query = select(*columns) if columns else select(self._model)
+
+        if filters:
+            query = query.filter_by(**filters)
+
+        result = await self.session.stream(self._for_read(query), execution_options={'yield_per': chunk_size})
+        chunks = result.partitions() if columns else result.scalars().partitions()
+        try:
+            async for chunk in chunks:
+                yield list(chunk)
+        finally:
+            # Серверный курсор закрывается и при досрочной остановке потребителя
+            await result.close()
+
     async def update(self, identifier: UUID | int, **kwargs: Any) -> None:
         await self.session.execute(update(self._model).where(self._model.id == identifier).values(kwargs))
+        self._invalidate_cache((identifier,))
 
     async def update_object(self, db_object: Model) -> None:
         self.session.add(db_object)
         await self.session.flush()
         await self.session.refresh(db_object)
+        self._invalidate_cache((db_object.id,))
 
     async def update_many(self, db_objects: list[Model]):
         self.session.add_all(db_objects)
         await self.session.flush()
+        self._invalidate_cache(db_object.id for db_object in db_objects)
+
+    async def bulk_update(
+        self,
+        values: Sequence[dict[str, Any]] | dict[str, Any],
+        ids: Sequence[UUID | int] | None = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+        *,
+        return_ids: bool = False,
+    ) -> list[UUID | int]:
+        if isinstance(values, dict):
+            if ids is None:
+                raise ValueError('ids are required when a single values dict is passed')
+            self._invalidate_cache(ids)
+            return await update_by_ids(
+                self.session, self._model, ids, values, chunk_size=chunk_size, return_ids=return_ids
+            )
+        result = await bulk_update_rows(
+            self.session, self._model, values, chunk_size=chunk_size, return_ids=return_ids
+        )
+        self._invalidate_cache(row['id'] for row in values)
+        return result
 
     async def delete(self, obj_id: UUID | int) -> None:
         db_object = await self.session.get(self._model, obj_id)
         if db_object:
             await self.session.delete(db_object)
+            self._invalidate_cache((obj_id,))
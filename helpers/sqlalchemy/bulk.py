@@ -0,0 +1,175 @@
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from itertools import groupby
+from typing import Any
+
+from sqlalchemy import Table, column, inspect, select, update
+from sqlalchemy import values as values_clause
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from helpers.sqlalchemy.base_model import Base
+
+DEFAULT_BULK_CHUNK_SIZE = 1000
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')
+
+_DIALECT_INSERTS: dict[str, Callable[..., Any]] = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+def _make_insert(session: AsyncSession, target: type[Base] | Table) -> Any:
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name not in _DIALECT_INSERTS:
+        raise ValueError(
+            f'Bulk insert supports only {", ".join(_DIALECT_INSERTS)} dialects, got {dialect_name}: use create_many'
+        )
+    return _DIALECT_INSERTS[dialect_name](target)
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: type[Base],
+    values: Sequence[dict[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    conflict_columns: Sequence[str] | None = None,
+    update_columns: Sequence[str] | None = None,
+    return_objects: bool = False,
+) -> list[Any]:
+    """Многострочный INSERT ... RETURNING пачками по chunk_size строк без unit of work.
+
+    С conflict_columns выполняется upsert: пустой update_columns означает ON CONFLICT DO NOTHING,
+    None - обновление всех переданных колонок кроме conflict_columns. При DO NOTHING в результат
+    попадают только вставленные строки.
+    """
+    if not values:
+        return []
+
+    table = model.__table__
+    # Без гидратации вставка идёт через Core: ORM не разбирает каждую строку на INSERT-команды.
+    # Core понимает только имена колонок, поэтому модели с другими именами атрибутов идут через ORM
+    use_core = not return_objects and all(prop.key == prop.columns[0].key for prop in inspect(model).column_attrs)
+    statement = _make_insert(session, table if use_core else model)
+    # Метки времени одни на весь вызов, а не вызов функции по умолчанию на каждую строку
+    now = datetime.now()
+    timestamps = {name: now for name in TIMESTAMP_COLUMNS if name in table.c}
+    if timestamps:
+        statement = statement.values(timestamps)
+    if conflict_columns is not None:
+        if update_columns is None:
+            update_columns = [column for column in values[0] if column not in conflict_columns]
+        if update_columns:
+            set_ = {column: statement.excluded[column] for column in update_columns}
+            if 'updated_at' in table.c and 'updated_at' not in set_:
+                set_['updated_at'] = statement.excluded['updated_at']
+            statement = statement.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    statement = statement.returning(table.c.id if use_core else model if return_objects else model.id)
+    execution_options = {'insertmanyvalues_page_size': chunk_size}
+    if return_objects:
+        execution_options['populate_existing'] = True
+
+    result: list[Any] = []
+    for start in range(0, len(values), chunk_size):
+        chunk = list(values[start : start + chunk_size])
+        # ORM сам группирует строки по набору колонок, а Core берёт его из первой строки
+        batches = [list(group) for _, group in groupby(chunk, key=tuple)] if use_core else [chunk]
+        for batch in batches:
+            rows = await session.scalars(statement, batch, execution_options=execution_options)
+            result.extend(rows.all())
+    return result
+
+
+async def bulk_update_rows(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Sequence[dict[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    return_ids: bool = False,
+) -> list[Any]:
+    """Обновление строк по id: каждый словарь содержит id и новые значения.
+
+    В Postgres каждая пачка - один UPDATE ... FROM (VALUES ...), в остальных диалектах - executemany,
+    а с return_ids - UPDATE ... RETURNING на каждую строку, если диалект его поддерживает.
+    updated_at и другие onupdate-колонки SQLAlchemy проставляет сам, как и при update_object.
+    Уже загруженные в сессию объекты перечитываются из БД.
+    """
+    if not rows:
+        return []
+
+    # Для VALUES у всех строк пачки должен быть одинаковый набор колонок
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for row in rows:
+        if 'id' not in row:
+            raise ValueError(f'Each row of bulk update must contain id, got keys: {", ".join(row)}')
+        groups.setdefault(tuple(row), []).append(row)
+
+    dialect = session.get_bind().dialect
+    if return_ids and not dialect.update_returning:
+        raise ValueError(f'Dialect {dialect.name} does not support UPDATE ... RETURNING')
+
+    result: list[Any] = []
+    if dialect.name != 'postgresql':
+        for group in groups.values():
+            if return_ids:
+                for row in group:
+                    values = {key: value for key, value in row.items() if key != 'id'}
+                    statement = update(model).where(model.id == row['id']).values(values).returning(model.id)
+                    result.extend((await session.scalars(statement)).all())
+                continue
+            for start in range(0, len(group), chunk_size):
+                await session.execute(update(model), group[start : start + chunk_size])
+        await _refresh_loaded(session, model, [row['id'] for row in rows], chunk_size)
+        return result
+
+    table = model.__table__
+    for keys, group in groups.items():
+        for start in range(0, len(group), chunk_size):
+            data = values_clause(*(column(key, table.c[key].type) for key in keys), name='bulk_update_values').data(
+                [tuple(row[key] for key in keys) for row in group[start : start + chunk_size]],
+            )
+            statement = (
+                update(table)
+                .where(table.c.id == data.c.id)
+                .values({key: data.c[key] for key in keys if key != 'id'})
+            )
+            if return_ids:
+                result.extend((await session.scalars(statement.returning(table.c.id))).all())
+            else:
+                await session.execute(statement)
+    await _refresh_loaded(session, model, [row['id'] for row in rows], chunk_size)
+    return result
+
+
+async def _refresh_loaded(session: AsyncSession, model: type[Base], ids: Sequence[Any], chunk_size: int) -> None:
+    # UPDATE по первичному ключу не синхронизирует identity map, загруженные объекты перечитываются одним SELECT
+    mapper = inspect(model)
+    loaded = [obj_id for obj_id in ids if mapper.identity_key_from_primary_key((obj_id,)) in session.identity_map]
+    for start in range(0, len(loaded), chunk_size):
+        query = select(model).where(model.id.in_(loaded[start : start + chunk_size]))
+        await session.scalars(query.execution_options(populate_existing=True))
+
+
+async def update_by_ids(
+    session: AsyncSession,
+    model: type[Base],
+    ids: Sequence[Any],
+    values: dict[str, Any],
+    *,
+    chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    return_ids: bool = False,
+) -> list[Any]:
+    result: list[Any] = []
+    for start in range(0, len(ids), chunk_size):
+        statement = update(model).where(model.id.in_(ids[start : start + chunk_size])).values(values)
+        if return_ids:
+            result.extend((await session.scalars(statement.returning(model.id))).all())
+        else:
+            await session.execute(statement)
+    return result
@@ -1,26 +1,80 @@
+from collections.abc import Sequence
+
 from pydantic import PostgresDsn
-from sqlalchemy import AsyncAdaptedQueuePool, text
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
     async_scoped_session,
     async_sessionmaker,
-    AsyncSession,
     create_async_engine,
 )
 
 from helpers.contextvars import TRACE_ID
 from helpers.sqlalchemy.base_model import Base
+from helpers.sqlalchemy.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    PoolConfig,
+    install_idle_ping,
+)
+from helpers.sqlalchemy.replicas import (
+    PrimaryStickiness,
+    ReplicaSelection,
+    ReplicaSet,
+    RoutingSession,
+)
+from helpers.sqlalchemy.session import LazyAsyncSession
+
+
+def _make_engine(dsn: PostgresDsn | str, pool_config: PoolConfig, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url=dsn if isinstance(dsn, str) else dsn.unicode_string(),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=pool_config.pool_size,
+        max_overflow=pool_config.max_overflow,
+        pool_timeout=pool_config.pool_timeout,
+        pool_recycle=pool_config.pool_recycle,
+        pool_pre_ping=pool_config.pre_ping,
+        pool_logging_name=name,
+        echo=False,
+    )
+    if not pool_config.pre_ping and pool_config.ping_idle_after is not None:
+        install_idle_ping(engine, pool_config.ping_idle_after)
+    return engine
 
 
 class SQLAlchemyClient:
-    def __init__(self, dsn: PostgresDsn) -> None:
-        self._engine = create_async_engine(
-            url=dsn.unicode_string(),
-            poolclass=AsyncAdaptedQueuePool,
-            pool_pre_ping=True,
-            echo=False,
-        )
-        self._ctx_session_manager = async_scoped_session(
-            async_sessionmaker(autoflush=True, expire_on_commit=False, bind=self._engine),
+    def __init__(
+        self,
+        dsn: PostgresDsn | str,
+        replica_dsns: Sequence[PostgresDsn | str] = (),
+        replica_selection: ReplicaSelection = ReplicaSelection.ROUND_ROBIN,
+        sticky_primary_ttl: float = 5.0,
+        pool_config: PoolConfig | None = None,
+        replica_pool_config: PoolConfig | None = None,
+    ) -> None:
+        pool_config = pool_config or PoolConfig()
+        self._engine = _make_engine(dsn, pool_config, 'primary')
+        self._replica_engines = [
+            _make_engine(replica_dsn, replica_pool_config or pool_config, f'replica_{index}')
+            for index, replica_dsn in enumerate(replica_dsns)
+        ]
+        replicas = ReplicaSet(self._replica_engines, replica_selection) if self._replica_engines else None
+        self._stickiness = PrimaryStickiness(sticky_primary_ttl)
+        self._ctx_session_manager = self._make_session_manager(replicas, read_only=False)
+        self._ctx_read_session_manager = self._make_session_manager(replicas, read_only=True)
+
+    def _make_session_manager(
+        self, replicas: ReplicaSet | None, *, read_only: bool
+    ) -> async_scoped_session[AsyncSession]:
+        return async_scoped_session(
+            async_sessionmaker(
+                autoflush=True,
+                expire_on_commit=False,
+                bind=self._engine,
+                sync_session_class=RoutingSession,
+                info={'replicas': replicas, 'stickiness': self._stickiness, 'read_only': read_only},
+            ),
             scopefunc=TRACE_ID.get,
         )
 
@@ -28,14 +82,28 @@ class SQLAlchemyClient:
     def session_factory(self) -> async_sessionmaker[AsyncSession]:
         return self._ctx_session_manager.session_factory
 
-    def get_session(self) -> AsyncSession:
-        return self._ctx_session_manager()
+    def get_session(self, *, read_only: bool = False) -> AsyncSession:
+        # Чтения из read_only-сессии уходят в реплики, если они заданы
+        session_manager = self._ctx_read_session_manager if read_only else self._ctx_session_manager
+        session = session_manager()
+        session.info.setdefault('trace_id', TRACE_ID.get())
+        return session
+
+    def new_session(self, *, read_only: bool = False) -> LazyAsyncSession:
+        # Отдельная сессия без привязки к TRACE_ID, закрывать её должен вызывающий код
+        session_manager = self._ctx_read_session_manager if read_only else self._ctx_session_manager
+        session = LazyAsyncSession(**session_manager.session_factory.kw)
+        session.info['trace_id'] = TRACE_ID.get()
+        return session
 
     async def close_ctx_session(self) -> None:
         await self._ctx_session_manager.remove()
+        await self._ctx_read_session_manager.remove()
 
     async def close(self) -> None:
         await self._engine.dispose()
+        for replica_engine in self._replica_engines:
+            await replica_engine.dispose()
 
     async def drop_all_tables(self) -> None:
         metadata = Base.metadata
@@ -0,0 +1,297 @@
+import asyncio
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from datetime import date, datetime
+from datetime import time as dt_time
+from decimal import Decimal
+from enum import Enum
+from functools import cache
+from time import time
+from typing import Any
+from uuid import UUID
+
+import orjson
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from helpers.metrics import Counter
+from helpers.redis_client.client import RedisClient
+from helpers.sqlalchemy.base_model import Base
+
+ENTITY_CACHE_PENDING_INVALIDATIONS = 'entity_cache_pending_invalidations'
+
+# Запись кладётся только если версия сущности не изменилась с момента чтения из БД
+_SET_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+ENTITY_CACHE_REQUESTS = Counter(
+    'entity_cache_requests_total',
+    'Entity cache lookups by result',
+    ('entity', 'result'),
+)
+
+_INVALIDATION_TASKS: set[asyncio.Task[None]] = set()
+
+
+def _make_converter(python_type: type) -> Callable[[Any], Any] | None:
+    if python_type is bytes:
+        return b64decode
+    if python_type is UUID:
+        return UUID
+    if python_type is datetime:
+        return datetime.fromisoformat
+    if python_type is date:
+        return date.fromisoformat
+    if python_type is dt_time:
+        return dt_time.fromisoformat
+    if python_type is Decimal:
+        return Decimal
+    if issubclass(python_type, Enum):
+        return python_type
+    return None
+
+
+@cache
+def _get_converters(model: type[Base]) -> dict[str, Callable[[Any], Any] | None]:
+    converters: dict[str, Callable[[Any], Any] | None] = {}
+    for prop in inspect(model).column_attrs:
+        try:
+            converters[prop.key] = _make_converter(prop.columns[0].type.python_type)
+        except NotImplementedError:
+            converters[prop.key] = None
+    return converters
+
+
+def _dump_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return b64encode(value).decode()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Type {type(value).__name__} is not supported by entity cache')
+
+
+def dump_entity(db_object: Base) -> str:
+    mapper = inspect(db_object).mapper
+    values = {prop.key: getattr(db_object, prop.key) for prop in mapper.column_attrs}
+    return orjson.dumps(values, default=_dump_default).decode()
+
+
+def load_entity[Model: Base](model: type[Model], values: dict[str, Any]) -> Model:
+    converters = _get_converters(model)
+    db_object = model(
+        **{
+            key: converter(value) if (converter := converters.get(key)) and value is not None else value
+            for key, value in values.items()
+            if key in converters
+        }
+    )
+    make_transient_to_detached(db_object)
+    return db_object
+
+
+class EntityCache:
+    """Кеш сущностей по первичному ключу: Redis и необязательный локальный LRU перед ним.
+
+    Записи сбрасываются после commit сессии, в которой сущности изменялись через репозиторий.
+    Локальный уровень сбрасывается только в своём процессе, поэтому его local_ttl должен быть коротким.
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        ttl: int = 300,
+        key_prefix: str = 'entity_cache',
+        local_max_entries: int = 0,
+        local_ttl: float = 5,
+        version_ttl: int = 86400,
+    ) -> None:
+        self._redis_client = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.version_ttl = version_ttl
+        self._local: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+
+    async def _get_redis(self) -> Redis:
+        if self._redis_client.redis is None:
+            await self._redis_client.__aenter__()
+        return self._redis_client.redis  # type: ignore
+
+    def make_key(self, model: type[Base], obj_id: Any) -> str:
+        return f'{self.key_prefix}:{model.__tablename__}:{obj_id}'
+
+    def _version_key(self, key: str) -> str:
+        return f'{key}:version'
+
+    def _get_local(self, key: str) -> dict[str, Any] | None:
+        if (item := self._local.get(key)) is None:
+            return None
+        values, expires_at = item
+        if expires_at <= time():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return values
+
+    def _set_local(self, key: str, values: dict[str, Any]) -> None:
+        if not self.local_max_entries:
+            return
+        self._local[key] = (values, time() + self.local_ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    def drop_local(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._local.pop(key, None)
+
+    async def _attach[Model: Base](self, session: AsyncSession, model: type[Model], values: dict[str, Any]) -> Model:
+        return await session.merge(load_entity(model, values), load=False)
+
+    async def _read_versions(self, keys: Sequence[str]) -> list[str]:
+        try:
+            redis = await self._get_redis()
+            versions = await redis.mget([self._version_key(key) for key in keys])
+        except RedisError as exc:
+            logger.warning(f'Entity cache is unavailable: {exc}')
+            return []
+        return [version or '0' for version in versions]
+
+    async def _store(self, entries: Sequence[tuple[str, str, str]]) -> None:
+        # entries - (ключ, версия до чтения из БД, сериализованная строка)
+        if not entries:
+            return
+        try:
+            redis = await self._get_redis()
+            script = redis.register_script(_SET_IF_VERSION_SCRIPT)
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, version, data in entries:
+                    await script(keys=[key, self._version_key(key)], args=[version, data, self.ttl], client=pipe)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f'Entity cache is unavailable: {exc}')
+
+    async def get[Model: Base](
+        self,
+        session: AsyncSession,
+        model: type[Model],
+        obj_id: Any,
+        load: Callable[[Any], Awaitable[Model | None]],
+    ) -> Model | None:
+        found = await self.get_many(session, model, [obj_id], lambda ids: _load_one(load, ids[0]))
+        return found[0] if found else None
+
+    async def get_many[Model: Base](
+        self,
+        session: AsyncSession,
+        model: type[Model],
+        ids: Sequence[Any],
+        load: Callable[[list[Any]], Awaitable[list[Model]]],
+    ) -> list[Model]:
+        mapper = inspect(model)
+        entity = model.__tablename__
+        found: dict[Any, Model] = {}
+        missing: dict[str, Any] = {}
+
+        for obj_id in dict.fromkeys(ids):
+            # Сущность, уже загруженная в сессию, может содержать незафиксированные изменения
+            identity_key = mapper.identity_key_from_primary_key((obj_id,))
+            if (db_object := session.identity_map.get(identity_key)) is not None:
+                found[obj_id] = db_object
+                continue
+            key = self.make_key(model, obj_id)
+            if (values := self._get_local(key)) is not None:
+                ENTITY_CACHE_REQUESTS.inc((entity, 'local_hit'))
+                found[obj_id] = await self._attach(session, model, values)
+            else:
+                missing[key] = obj_id
+
+        if missing:
+            keys = list(missing)
+            try:
+                redis = await self._get_redis()
+                cached = await redis.mget(keys)
+            except RedisError as exc:
+                logger.warning(f'Entity cache is unavailable: {exc}')
+                cached = [None] * len(keys)
+            for key, data in zip(keys, cached):
+                if data is None:
+                    continue
+                ENTITY_CACHE_REQUESTS.inc((entity, 'hit'))
+                values = orjson.loads(data)
+                self._set_local(key, values)
+                found[missing.pop(key)] = await self._attach(session, model, values)
+
+        if missing:
+            ENTITY_CACHE_REQUESTS.inc((entity, 'miss'), len(missing))
+            keys = list(missing)
+            versions = await self._read_versions(keys)
+            loaded = {db_object.id: db_object for db_object in await load(list(missing.values()))}
+            entries = []
+            for key, version in zip(keys, versions):
+                if (db_object := loaded.get(missing[key])) is None:
+                    continue
+                try:
+                    entries.append((key, version, dump_entity(db_object)))
+                except TypeError as exc:
+                    # Сущности с колонками, которые нельзя восстановить из JSON, не кешируются
+                    logger.warning(f'Entity {entity} is not cached: {exc}')
+            await self._store(entries)
+            for key in keys:
+                if (db_object := loaded.get(missing[key])) is not None:
+                    found[missing[key]] = db_object
+
+        return [found[obj_id] for obj_id in ids if obj_id in found]
+
+    async def invalidate(self, keys: Sequence[str]) -> None:
+        self.drop_local(keys)
+        if not keys:
+            return
+        try:
+            redis = await self._get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                for key in keys:
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self.version_ttl)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f'Entity cache invalidation failed: {exc}')
+
+    def invalidate_on_commit(self, session: AsyncSession, model: type[Base], ids: Iterable[Any]) -> None:
+        pending: dict[EntityCache, set[str]] = session.info.setdefault(ENTITY_CACHE_PENDING_INVALIDATIONS, {})
+        pending.setdefault(self, set()).update(self.make_key(model, obj_id) for obj_id in ids)
+
+
+async def _load_one[Model: Base](load: Callable[[Any], Awaitable[Model | None]], obj_id: Any) -> list[Model]:
+    db_object = await load(obj_id)
+    return [db_object] if db_object is not None else []
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session) -> None:
+    pending: dict[EntityCache, set[str]] | None = session.info.pop(ENTITY_CACHE_PENDING_INVALIDATIONS, None)
+    if not pending:
+        return
+    loop = asyncio.get_running_loop()
+    for entity_cache, keys in pending.items():
+        entity_cache.drop_local(keys)
+        task = loop.create_task(entity_cache.invalidate(list(keys)))
+        _INVALIDATION_TASKS.add(task)
+        task.add_done_callback(_INVALIDATION_TASKS.discard)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(ENTITY_CACHE_PENDING_INVALIDATIONS, None)
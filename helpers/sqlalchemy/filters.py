@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, bindparam, select
+
+from helpers.filters.operators import FilterOperator
+from helpers.sqlalchemy.base_model import Base
+
+FilterShape = tuple[tuple[str, str], ...]
+
+_OPERATORS: dict[str, Callable[[Any, str], ColumnElement[bool]]] = {
+    'eq': lambda column, name: column == bindparam(name),
+    'ne': lambda column, name: column != bindparam(name),
+    'gt': lambda column, name: column > bindparam(name),
+    'lt': lambda column, name: column < bindparam(name),
+    'gte': lambda column, name: column >= bindparam(name),
+    'lte': lambda column, name: column <= bindparam(name),
+    'in_': lambda column, name: column.in_(bindparam(name, expanding=True)),
+    'between': lambda column, name: column.between(bindparam(f'{name}_from'), bindparam(f'{name}_to')),
+}
+
+
+def _collect_filter(filter_model: BaseModel) -> tuple[FilterShape, dict[str, Any]]:
+    shape: list[tuple[str, str]] = []
+    params: dict[str, Any] = {}
+    for field_name, value in filter_model:
+        if value is None:
+            continue
+        # Обычное значение вместо FilterOperator сравнивается на равенство
+        operators = value if isinstance(value, FilterOperator) else FilterOperator(eq=value)
+        for operator_name, operand in operators:
+            if operand is None:
+                continue
+            name = f'{field_name}_{operator_name}'
+            shape.append((field_name, operator_name))
+            if operator_name == 'between':
+                params[f'{name}_from'], params[f'{name}_to'] = operand
+            else:
+                params[name] = operand
+    return tuple(shape), params
+
+
+@lru_cache(maxsize=1024)
+def _build_filtered_select(model: type[Base], shape: FilterShape) -> Select[Any]:
+    # Одинаковая форма фильтра даёт тот же объект запроса, и SQLAlchemy берёт скомпилированный SQL из кэша
+    clauses = [
+        _OPERATORS[operator_name](getattr(model, field_name), f'{field_name}_{operator_name}')
+        for field_name, operator_name in shape
+    ]
+    return select(model).where(*clauses)
+
+
+def compile_filter(model: type[Base], filter_model: BaseModel) -> tuple[Select[Any], dict[str, Any]]:
+    shape, params = _collect_filter(filter_model)
+    return _build_filtered_select(model, shape), params
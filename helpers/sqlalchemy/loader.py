@@ -0,0 +1,108 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from helpers.sqlalchemy.base_model import Base
+
+BATCH_LOADERS = 'batch_loaders'
+
+
+class BatchLoader[Model: Base]:
+    """Группирует get(id), вызванные за один проход event loop, в один запрос WHERE id IN (...).
+
+    Результаты запоминаются до конца транзакции сессии, повторный get(id) запрос не выполняет.
+    """
+
+    def __init__(self, load_many: Callable[[list[Any]], Awaitable[list[Model]]], max_batch_size: int = 1000) -> None:
+        self._load_many = load_many
+        self.max_batch_size = max_batch_size
+        self._memo: dict[Any, asyncio.Future[Model | None]] = {}
+        self._batch: dict[Any, asyncio.Future[Model | None]] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def load(self, obj_id: Any) -> Awaitable[Model | None]:
+        # Отмена одного вызывающего не должна отменять общий результат для остальных
+        if (future := self._memo.get(obj_id)) is not None:
+            return asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = self._memo[obj_id] = loop.create_future()
+        future.add_done_callback(lambda done: self._evict_failed(obj_id, done))
+        if self._batch is None:
+            # Запрос уходит после того, как отработают все корутины, уже готовые к выполнению
+            self._batch = {}
+            loop.call_soon(self._dispatch)
+        self._batch[obj_id] = future
+        return asyncio.shield(future)
+
+    def forget(self, ids: Iterable[Any]) -> None:
+        for obj_id in ids:
+            self._memo.pop(obj_id, None)
+
+    def _evict_failed(self, obj_id: Any, future: asyncio.Future[Model | None]) -> None:
+        if (future.cancelled() or future.exception() is not None) and self._memo.get(obj_id) is future:
+            del self._memo[obj_id]
+
+    def _dispatch(self) -> None:
+        batch, self._batch = self._batch or {}, None
+        task = asyncio.ensure_future(self._resolve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._finish)
+
+    def _finish(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            # Ошибку уже получили вызывающие через future своих id
+            task.exception()
+
+    async def _resolve(self, batch: dict[Any, asyncio.Future[Model | None]]) -> None:
+        ids = list(batch)
+        try:
+            loaded: dict[Any, Model] = {}
+            for start in range(0, len(ids), self.max_batch_size):
+                db_objects = await self._load_many(ids[start : start + self.max_batch_size])
+                loaded.update((db_object.id, db_object) for db_object in db_objects)
+        except BaseException as exc:
+            for future in batch.values():
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            raise
+
+        for obj_id, future in batch.items():
+            if not future.done():
+                future.set_result(loaded.get(obj_id))
+
+
+def get_batch_loader[Model: Base](
+    session: AsyncSession,
+    model: type[Model],
+    owner: type,
+    load_many: Callable[[list[Any]], Awaitable[list[Model]]],
+) -> BatchLoader[Model]:
+    # У репозиториев одной модели может быть свой кеш и свои условия выборки, поэтому загрузчик - на класс
+    loaders: dict[tuple[type[Base], type], BatchLoader[Any]] = session.info.setdefault(BATCH_LOADERS, {})
+    if (loader := loaders.get((model, owner))) is None:
+        loader = loaders[(model, owner)] = BatchLoader(load_many)
+    return loader
+
+
+def forget_loaded(session: AsyncSession, model: type[Base], ids: Iterable[Any]) -> None:
+    ids = list(ids)
+    for (loaded_model, _), loader in session.info.get(BATCH_LOADERS, {}).items():
+        if loaded_model is model:
+            loader.forget(ids)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_batch_loaders(session: Session, transaction: SessionTransaction) -> None:
+    # Запомненные сущности живут до commit, rollback или close сессии
+    if transaction.parent is None:
+        session.info.pop(BATCH_LOADERS, None)
@@ -0,0 +1,109 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from enum import StrEnum
+from typing import Any
+from uuid import UUID
+
+import orjson
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from helpers.errors.api import InvalidCursorError
+
+_CURSOR_VALUE_PARSERS: dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    UUID: UUID,
+    Decimal: Decimal,
+}
+
+
+class CursorDirection(StrEnum):
+    NEXT = 'next'
+    PREV = 'prev'
+
+
+class KeysetPage:
+    def __init__(self, data: list[Any], next_cursor: str | None, prev_cursor: str | None) -> None:
+        self.data = data
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def encode_cursor(values: Sequence[Any], direction: CursorDirection) -> str:
+    raw = orjson.dumps({'d': direction, 'v': list(values)}, default=str)
+    return urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _parse_cursor_value(value: Any, column: InstrumentedAttribute[Any]) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    parser = _CURSOR_VALUE_PARSERS.get(python_type)
+    return parser(value) if parser else value
+
+
+def decode_cursor(
+    cursor: str, columns: Sequence[InstrumentedAttribute[Any]]
+) -> tuple[CursorDirection, list[Any]]:
+    try:
+        raw = orjson.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        direction = CursorDirection(raw['d'])
+        values = raw['v']
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursorError
+        return direction, [_parse_cursor_value(value, column) for value, column in zip(values, columns)]
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError) as err:
+        raise InvalidCursorError from err
+
+
+def apply_keyset(
+    query: Select[Any],
+    columns: Sequence[InstrumentedAttribute[Any]],
+    cursor: str | None,
+    limit: int,
+    *,
+    descending: bool = False,
+) -> tuple[Select[Any], CursorDirection | None]:
+    direction = None
+    # Страница назад выбирается в обратном порядке, а затем разворачивается в make_keyset_page
+    backward = descending
+    if cursor:
+        direction, values = decode_cursor(cursor, columns)
+        backward = descending != (direction == CursorDirection.PREV)
+        key = tuple_(*columns)
+        query = query.where(key < tuple_(*values) if backward else key > tuple_(*values))
+    order_by = [column.desc() if backward else column.asc() for column in columns]
+    return query.order_by(*order_by).limit(limit + 1), direction
+
+
+def make_keyset_page(
+    rows: list[Any],
+    columns: Sequence[InstrumentedAttribute[Any]],
+    limit: int,
+    direction: CursorDirection | None,
+) -> KeysetPage:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == CursorDirection.PREV:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(data=[], next_cursor=None, prev_cursor=None)
+
+    def _cursor(row: Any, cursor_direction: CursorDirection) -> str:
+        return encode_cursor([getattr(row, column.key) for column in columns], cursor_direction)
+
+    # В сторону, откуда пришёл курсор, страницы есть всегда, в сторону движения - только если выбрано больше limit
+    has_next = has_more if direction != CursorDirection.PREV else True
+    has_prev = has_more if direction == CursorDirection.PREV else direction is not None
+    return KeysetPage(
+        data=rows,
+        next_cursor=_cursor(rows[-1], CursorDirection.NEXT) if has_next else None,
+        prev_cursor=_cursor(rows[0], CursorDirection.PREV) if has_prev else None,
+    )
@@ -0,0 +1,108 @@
+from collections.abc import Callable
+from time import monotonic, perf_counter
+from typing import Any
+from weakref import WeakSet
+
+from pydantic import BaseModel
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from helpers.metrics import Counter, Gauge, Histogram, MetricSamples
+
+POOL_CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+_CHECKED_IN_AT = 'checked_in_at'
+_TRACKED_POOLS: WeakSet['InstrumentedAsyncAdaptedQueuePool'] = WeakSet()
+
+
+class PoolConfig(BaseModel):
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    # pre_ping проверяет соединение на каждой выдаче. Чтобы проверять только простоявшие дольше N секунд,
+    # выключите pre_ping и задайте ping_idle_after
+    pre_ping: bool = True
+    ping_idle_after: float | None = None
+
+
+def _sum_by_pool(value: Callable[['InstrumentedAsyncAdaptedQueuePool'], int]) -> MetricSamples:
+    samples: dict[tuple[str, ...], float] = {}
+    for pool in list(_TRACKED_POOLS):
+        key = (pool.metrics_name,)
+        samples[key] = samples.get(key, 0) + value(pool)
+    return samples.items()
+
+
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    'db_pool_checkout_duration_seconds',
+    'Time to get a connection from the SQLAlchemy pool',
+    ('pool',),
+    buckets=POOL_CHECKOUT_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    'db_pool_checkout_timeouts_total',
+    'SQLAlchemy pool checkouts failed with a pool timeout',
+    ('pool',),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    'db_pool_connections_in_use',
+    'Connections checked out of the SQLAlchemy pool',
+    ('pool',),
+    collect=lambda: _sum_by_pool(lambda pool: pool.checkedout()),
+)
+DB_POOL_CONNECTIONS_IDLE = Gauge(
+    'db_pool_connections_idle',
+    'Idle connections in the SQLAlchemy pool',
+    ('pool',),
+    collect=lambda: _sum_by_pool(lambda pool: pool.checkedin()),
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow_connections',
+    'Connections opened above pool_size',
+    ('pool',),
+    collect=lambda: _sum_by_pool(lambda pool: max(pool.overflow(), 0)),
+)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        _TRACKED_POOLS.add(self)
+
+    @property
+    def metrics_name(self) -> str:
+        return getattr(self, 'logging_name', None) or 'default'
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc((self.metrics_name,))
+            raise
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(perf_counter() - started_at, (self.metrics_name,))
+
+
+def install_idle_ping(engine: AsyncEngine, idle_after: float) -> None:
+    sync_engine = engine.sync_engine
+
+    def _on_checkin(_dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info[_CHECKED_IN_AT] = monotonic()
+
+    def _on_checkout(dbapi_connection: Any, connection_record: Any, _connection_proxy: Any) -> None:
+        checked_in_at = connection_record.info.get(_CHECKED_IN_AT)
+        if checked_in_at is None or monotonic() - checked_in_at < idle_after:
+            return
+        try:
+            is_alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as err:
+            # DisconnectionError заставляет пул выбросить соединение и выдать новое
+            raise exc.DisconnectionError from err
+        if not is_alive:
+            raise exc.DisconnectionError
+
+    event.listen(sync_engine, 'checkin', _on_checkin)
+    event.listen(sync_engine, 'checkout', _on_checkout)
@@ -0,0 +1,95 @@
+from collections.abc import Sequence
+from enum import StrEnum
+from itertools import count
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import Engine, Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.dml import UpdateBase
+
+from helpers.contextvars import DEFAULT_TRACE_ID
+
+USE_REPLICA_OPTION = 'use_replica'
+# Сверх этого числа трасс из PrimaryStickiness вычищаются истёкшие
+MAX_STICKY_TRACES = 10000
+
+
+class ReplicaSelection(StrEnum):
+    ROUND_ROBIN = 'round_robin'
+    LEAST_BUSY = 'least_busy'
+
+
+class ReplicaSet:
+    def __init__(
+        self, engines: Sequence[AsyncEngine], selection: ReplicaSelection = ReplicaSelection.ROUND_ROBIN
+    ) -> None:
+        self.engines = [engine.sync_engine for engine in engines]
+        self.selection = selection
+        self._counter = count()
+
+    def choose(self) -> Engine:
+        if self.selection == ReplicaSelection.LEAST_BUSY:
+            return min(self.engines, key=lambda engine: getattr(engine.pool, 'checkedout', lambda: 0)())
+        return self.engines[next(self._counter) % len(self.engines)]
+
+
+class PrimaryStickiness:
+    """Трассы, в которых была запись: их чтения идут в primary, пока реплики могут отставать.
+
+    Трасса по умолчанию общая для всех фоновых задач, поэтому не учитывается.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._until: dict[str, float] = {}
+
+    def mark(self, trace_id: str | None) -> None:
+        if trace_id is None or trace_id == DEFAULT_TRACE_ID or self.ttl <= 0:
+            return
+        now = monotonic()
+        if len(self._until) > MAX_STICKY_TRACES:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+        self._until[trace_id] = now + self.ttl
+
+    def is_sticky(self, trace_id: str | None) -> bool:
+        return trace_id is not None and self._until.get(trace_id, 0) > monotonic()
+
+
+class RoutingSession(Session):
+    """Сессия, которая отправляет чтения в реплики.
+
+    В реплику идёт SELECT без FOR UPDATE, если сессия создана только для чтения (info['read_only'])
+    или запрос помечен execution_options(use_replica=True); use_replica=False всегда ведёт в primary.
+    После записи в сессии и в течение ttl для той же трассы все запросы идут в primary.
+    """
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        *,
+        clause: ClauseElement | None = None,
+        **kw: Any,
+    ) -> Any:
+        replicas: ReplicaSet | None = self.info.get('replicas')
+        stickiness: PrimaryStickiness | None = self.info.get('stickiness')
+        trace_id = self.info.get('trace_id')
+
+        # Записью считаются только flush и INSERT/UPDATE/DELETE: text() и connection() идут в primary без отметки
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info['has_writes'] = True
+            if stickiness is not None:
+                stickiness.mark(trace_id)
+        elif (
+            isinstance(clause, Select)
+            and replicas is not None
+            and clause._for_update_arg is None  # noqa: SLF001
+            and clause.get_execution_options().get(USE_REPLICA_OPTION, self.info.get('read_only'))
+            and not self.info.get('has_writes')
+            and not (stickiness is not None and stickiness.is_sticky(trace_id))
+        ):
+            return replicas.choose()
+
+        return super().get_bind(mapper, clause=clause, **kw)
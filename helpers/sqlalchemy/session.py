@@ -0,0 +1,80 @@
+from typing import Any
+
+from sqlalchemy import Select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    Session,
+    SessionTransaction,
+    SessionTransactionOrigin,
+    UOWTransaction,
+)
+from sqlalchemy.sql import Executable
+
+
+class LazyAsyncSession(AsyncSession):
+    """Сессия, которая держит соединение из пула только на время работы с БД.
+
+    Соединение берётся на первом запросе (autobegin). Транзакция, в которой были только SELECT,
+    фиксируется сразу после запроса, и соединение возвращается в пул. Транзакция с записью
+    держит его до commit или rollback, после них соединение тоже сразу уходит в пул.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._has_writes = False
+        event.listen(self.sync_session, 'after_flush', self._mark_writes)
+        event.listen(self.sync_session, 'after_transaction_end', self._reset_writes)
+
+    def _mark_writes(self, session: Session, flush_context: UOWTransaction) -> None:
+        self._has_writes = True
+
+    def _reset_writes(self, session: Session, transaction: SessionTransaction) -> None:
+        if transaction.parent is None:
+            self._has_writes = False
+
+    def _before_statement(self, statement: Executable) -> None:
+        # SELECT ... FOR UPDATE держит блокировки до конца транзакции, поэтому считается записью
+        if not isinstance(statement, Select) or statement._for_update_arg is not None:  # noqa: SLF001
+            self._has_writes = True
+
+    async def _release_after_read(self) -> None:
+        transaction = self.sync_session.get_transaction()
+        if (
+            self._has_writes
+            or transaction is None
+            # Явно открытую транзакцию и savepoint завершает вызывающий код
+            or transaction.origin is not SessionTransactionOrigin.AUTOBEGIN
+            or self.sync_session.in_nested_transaction()
+            # Ожидающие flush изменения уйдут в БД только с записью
+            or self.sync_session.new
+            or self.sync_session.dirty
+            or self.sync_session.deleted
+        ):
+            return
+        await self.commit()
+
+    async def execute(self, statement: Executable, *args: Any, **kwargs: Any) -> Any:
+        self._before_statement(statement)
+        result = await super().execute(statement, *args, **kwargs)
+        await self._release_after_read()
+        return result
+
+    async def scalar(self, statement: Executable, *args: Any, **kwargs: Any) -> Any:
+        self._before_statement(statement)
+        result = await super().scalar(statement, *args, **kwargs)
+        await self._release_after_read()
+        return result
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        if kwargs.get('with_for_update'):
+            self._has_writes = True
+        db_object = await super().get(*args, **kwargs)
+        await self._release_after_read()
+        return db_object
+
+    async def get_one(self, *args: Any, **kwargs: Any) -> Any:
+        if kwargs.get('with_for_update'):
+            self._has_writes = True
+        db_object = await super().get_one(*args, **kwargs)
+        await self._release_after_read()
+        return db_object
@@ -1,6 +1,6 @@
 from typing import Any
 
-from helpers.models.response import PaginatedResponse
+from helpers.models.response import CursorPaginatedResponse, PaginatedResponse
 
 
 async def get_paginated_response(data: list[Any], count: int, limit: int = 100, offset: int = 0) -> PaginatedResponse:
@@ -10,4 +10,15 @@ async def get_paginated_response(data: list[Any], count: int, limit: int = 100,
         total=count,
         total_pages=count // limit if count % limit == 0 else count // limit + 1,
         data=data,
-    )
\ No newline at end of file
+    )
+
+
+async def get_cursor_paginated_response(
+    data: list[Any], next_cursor: str | None, prev_cursor: str | None, limit: int = 100
+) -> CursorPaginatedResponse:
+    return CursorPaginatedResponse(
+        size=limit,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        data=data,
+    )
@@ -0,0 +1,57 @@
+import asyncio
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped
+
+from helpers.depends.db_session import get_db_client, get_lazy_db_session
+from helpers.sqlalchemy.base_model import Base
+from helpers.sqlalchemy.base_repo import ISqlAlchemyRepository
+from helpers.sqlalchemy.client import SQLAlchemyClient
+
+
+class LazySessionCar(Base):
+    __tablename__ = 'lazy_session_cars'
+
+    name: Mapped[str]
+
+
+class LazySessionCarRepository(ISqlAlchemyRepository[LazySessionCar]):
+    _model = LazySessionCar
+
+
+async def _run(db_path: Path) -> list[int]:
+    db_client = SQLAlchemyClient(f'sqlite+aiosqlite:///{db_path}')
+    await db_client.create_all_tables()
+    pool = db_client._engine.pool  # noqa: SLF001
+    checked_out: list[int] = []
+
+    app = FastAPI()
+    app.dependency_overrides[get_db_client] = lambda: db_client
+
+    @app.post('/cars')
+    async def create_car(session: Annotated[AsyncSession, Depends(get_lazy_db_session)]) -> dict[str, int]:
+        repository = LazySessionCarRepository(session)
+        checked_out.append(pool.checkedout())
+        await repository.create(LazySessionCar(name='first'))
+        checked_out.append(pool.checkedout())
+        await session.commit()
+        # Обработчик ещё работает, а соединение уже в пуле
+        checked_out.append(pool.checkedout())
+        cars = await repository.get_list()
+        checked_out.append(pool.checkedout())
+        return {'cars': len(cars)}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.post('/cars')
+    assert response.json() == {'cars': 1}
+    checked_out.append(pool.checkedout())
+    await db_client.close()
+    return checked_out
+
+
+def test_lazy_session_releases_connection_while_handler_runs(tmp_path: Path) -> None:
+    assert asyncio.run(_run(tmp_path / 'lazy.db')) == [0, 1, 0, 0, 0]
@@ -0,0 +1,53 @@
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from helpers.api.middleware.logging import middleware
+from helpers.api.middleware.logging.middleware import (
+    FastAPILoggingMiddleware,
+    setup_logger_middleware,
+)
+from helpers.api.router import FastAPILoggingRouter
+
+
+@pytest.fixture
+def records(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    collected: list[Any] = []
+
+    async def _emit(record: Any) -> None:
+        collected.append(record)
+
+    monkeypatch.setattr(middleware, 'emit_log_record', _emit)
+    # setup_logger_middleware меняет атрибуты класса, monkeypatch вернёт их после теста
+    monkeypatch.setattr(FastAPILoggingMiddleware, 'destination', FastAPILoggingMiddleware.destination)
+    monkeypatch.setattr(
+        FastAPILoggingMiddleware,
+        'logging_substrings_of_routes_for_skip',
+        FastAPILoggingMiddleware.logging_substrings_of_routes_for_skip,
+    )
+    return collected
+
+
+def test_setup_after_include_router_skips_routes(records: list[Any]) -> None:
+    router = FastAPILoggingRouter()
+
+    @router.get('/ping')
+    async def ping() -> dict[str, str]:
+        return {'status': 'ok'}
+
+    @router.get('/items')
+    async def items() -> list[int]:
+        return [1]
+
+    app = FastAPI()
+    app.include_router(router)
+    setup_logger_middleware('svc', ['ping'])
+
+    client = TestClient(app)
+    assert client.get('/ping').status_code == 200
+    assert client.get('/items').status_code == 200
+
+    assert [record['method'] for record in records] == ['/items']
+    assert records[0]['destination'] == 'svc'